@@ -1,5 +1,9 @@
 from flask import Flask
 from app.database.connection import DatabaseConnection
+from app.reference_data import reference_data, load_from_database
+from app.storage.backends import create_storage
+from concurrent.futures import ThreadPoolExecutor
+import pyodbc
 from flask_cors import CORS
 
 def create_app(config_name='production'):
@@ -33,8 +37,35 @@ def create_app(config_name='production'):
     else:
         raise ValueError(f"Invalid configuration name: {config_name}")
 
-    # Initialize database connection
-    DatabaseConnection.initialize(app.config['DATABASE_URI'])
+    # Initialize the database connection pool
+    DatabaseConnection.initialize(
+        app.config['DATABASE_URI'],
+        min_size=app.config.get('DB_POOL_MIN_SIZE', 1),
+        max_size=app.config.get('DB_POOL_MAX_SIZE', 10),
+        timeout=app.config.get('DB_POOL_TIMEOUT', 30),
+        idle_timeout=app.config.get('DB_POOL_IDLE_TIMEOUT', 300),
+        ping_after=app.config.get('DB_POOL_PING_AFTER', 30),
+    )
+    # PDF blob storage (local directory, S3/MinIO bucket or in-memory fake)
+    app.extensions['pdf_storage'] = create_storage(app.config)
+    # Shared, bounded pool for multi-file uploads (spooling and blob writes)
+    app.extensions['pdf_upload_executor'] = ThreadPoolExecutor(
+        max_workers=app.config.get('PDF_UPLOAD_WORKERS', 4),
+        thread_name_prefix='pdf-upload',
+    )
+
+    # Every request checks out its own connection, commits its unit of work
+    # once after the view, and returns the connection at teardown
+    app.after_request(DatabaseConnection.complete_request)
+    app.teardown_appcontext(DatabaseConnection.release_request_connection)
+    # Preload committees/departments so dropdowns never wait on SQL Server
+    reference_data.reload_interval = app.config.get('REFERENCE_DATA_RELOAD_SECONDS', 300)
+    try:
+        with DatabaseConnection.unit_of_work() as uow:
+            reference_data.ensure_fresh(lambda: load_from_database(uow))
+    except pyodbc.Error as e:
+        print(f"Reference data preload failed, will load on first request: {e}")
+
     print(f" app file.... {__name__}")
     print(f" app file app.... {app}")
     # Register blueprints
@@ -43,6 +74,8 @@ def create_app(config_name='production'):
     from app.routes.department_routes import bp as department_bp
     from app.routes.estimator_routes import bp as estimator_bp
     from app.routes.pdf_routes import bp as pdf_bp
+    from app.routes.health_routes import bp as health_bp
+    from app.routes.lookup_routes import bp as lookup_bp
 
     print(f" app file.... {committee_bp}")
     
@@ -51,6 +84,8 @@ def create_app(config_name='production'):
     app.register_blueprint(department_bp, url_prefix='/api/departments')
     app.register_blueprint(estimator_bp, url_prefix='/api/estimators')
     app.register_blueprint(pdf_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(lookup_bp)
 
 
     return app
\ No newline at end of file
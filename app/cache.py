@@ -0,0 +1,97 @@
+# app/cache.py
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry.
+
+    get_or_load() is single-flight per key: when an entry expires, one thread
+    reloads it while concurrent callers for the same key wait for that result
+    instead of all hitting the database.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: Optional[int] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries  # None = unbounded (small fixed key sets)
+        self._entries: Dict[Hashable, tuple] = {}  # key -> (expires_at, value)
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by clear(); stale loads are not stored
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]):
+        """Store an entry, evicting expired then oldest ones past max_entries. Caller holds the lock."""
+        ttl = self.ttl if ttl is None else ttl
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, value)
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            now = time.monotonic()
+            for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[stale]
+                self._key_locks.pop(stale, None)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                del self._entries[oldest]
+                self._key_locks.pop(oldest, None)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have loaded it while we waited
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            generation = self._generation
+            value = loader()
+            with self._lock:
+                # Skip storing if invalidated while loading: the value may predate the write
+                if generation == self._generation:
+                    self._store(key, value, ttl)
+            return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+# Dashboard statistics over orderTable; cleared when orders are written
+order_stats_cache = TTLCache(ttl=30)
+
+# Per-estimator open/finished/cancelled counts; cleared by order inserts and estimator updates
+estimator_workload_cache = TTLCache(ttl=15)
+
+# pdfTable row (path, hash, names) per download key. Deletes clear it only in
+# the worker that handled them, so the TTL bounds how long other workers keep
+# serving a deleted row whose blob is still shared; a few seconds still covers
+# the burst of range requests a PDF viewer makes for one file.
+pdf_location_cache = TTLCache(ttl=5, max_entries=20000)
+
+# Size/mtime of stored PDF files with no pdfBlobs.sizeBytes (legacy rows),
+# keyed by sha256 (or path for pre-dedup rows). Blobs are immutable, so
+# entries only age out to bound memory.
+pdf_metadata_cache = TTLCache(ttl=24 * 3600, max_entries=200000)
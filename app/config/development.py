@@ -8,3 +8,44 @@ class DevelopmentConfig:
         'PWD=123'
     )
     PDF_BASE_PATH = 'D:/order_pdfs'  # Add this line
+    PDF_STORAGE = 'local'                    # 'local' (PDF_BASE_PATH), 's3' (S3/MinIO) or 'memory'
+    PDF_STAGING_PATH = None                  # where uploads are spooled; default depends on PDF_STORAGE
+    PDF_S3_BUCKET = None
+    PDF_S3_PREFIX = 'order_pdfs'
+    PDF_S3_ENDPOINT_URL = None               # e.g. 'http://localhost:9000' for MinIO
+    PDF_S3_REGION = None
+    PDF_S3_ACCESS_KEY = None                 # None = boto3's default credential chain
+    PDF_S3_SECRET_KEY = None
+    PDF_S3_MULTIPART_THRESHOLD = 16 * 1024 * 1024  # bigger uploads go as parallel multipart
+    PDF_S3_PART_SIZE = 8 * 1024 * 1024
+    PDF_S3_MAX_CONCURRENCY = 8
+    PDF_LAYOUT = 'sharded'                   # {year}/{h[0:2]}/{h[2:4]}/{sha256}.pdf; 'flat' = {sha256}.pdf
+    PDF_SHARD_LEVELS = 2                     # hash-prefix directory levels (2 hex chars each)
+    PDF_MAX_BYTES = 200 * 1024 * 1024        # largest accepted PDF
+    PDF_UPLOAD_CHUNK_SIZE = 1024 * 1024      # bytes copied per read while spooling
+    PDF_UPLOAD_MAX_FILES = 50                # pdf parts per POST /api/pdfs/upload
+    PDF_UPLOAD_WORKERS = 4                   # threads spooling/storing multi-file uploads (shared)
+    PDF_UPLOAD_MAX_TOTAL_BYTES = 1024 * 1024 * 1024  # all pdf parts of one upload together
+    MAX_CONTENT_LENGTH = PDF_UPLOAD_MAX_TOTAL_BYTES + 10 * 1024 * 1024  # + form overhead; rejects oversize requests before parsing
+    PDF_DOWNLOAD_MAX_AGE = 3600              # browser cache for GET /api/pdfs/<id>; content never changes
+    USE_X_SENDFILE = False                   # Apache/lighttpd: send X-Sendfile instead of the bytes
+    PDF_X_ACCEL_REDIRECT_PREFIX = None       # nginx: internal location aliased to PDF_BASE_PATH, e.g. '/protected-pdfs'
+
+    # Connection pool, sized against waitress's thread count (default 4)
+    DB_POOL_MIN_SIZE = 2
+    DB_POOL_MAX_SIZE = 8
+    DB_POOL_TIMEOUT = 15           # seconds to wait for a free connection
+    DB_POOL_IDLE_TIMEOUT = 300     # seconds before an idle connection is closed
+    DB_POOL_PING_AFTER = 30        # seconds idle before a checkout pings the server
+
+    # POST /api/orders/bulk
+    ORDER_IMPORT_CHUNK_SIZE = 500  # rows per transaction
+    ORDER_IMPORT_MAX_ROWS = 50000
+    ORDER_DETAILS_BATCH_MAX = 500  # ids per /api/orders/details call
+    BULK_UPSERT_MAX_ROWS = 5000    # PUT /api/estimators/bulk, /api/departments/bulk
+    ORDER_STATS_TTL = 30           # seconds /api/orders/stats is cached
+    EXPORT_BATCH_SIZE = 1000       # rows per fetchmany in /api/orders/export
+    ESTIMATOR_WORKLOAD_TTL = 15    # seconds /api/estimators/workload is cached
+
+    # Committees/departments cache; reloaded to pick up other nodes' writes
+    REFERENCE_DATA_RELOAD_SECONDS = 300
@@ -8,6 +8,62 @@ class BaseDAO:
         """
         self.connection = connection
 
+    @property
+    def raw_connection(self):
+        """
+        The underlying pyodbc connection (unwraps a request UnitOfWork).
+        Use it for private cursors, e.g. with fast_executemany.
+        """
+        return getattr(self.connection, 'raw_connection', self.connection)
+
+    def commit_now(self):
+        """
+        Commit immediately, even inside a request unit of work.
+        Only for chunked writes that must be durable chunk by chunk.
+        """
+        commit_now = getattr(self.connection, 'commit_now', None)
+        if commit_now is not None:
+            commit_now()
+        else:
+            self.connection.commit()
+
+    def after_commit(self, callback):
+        """
+        Run callback once this DAO's writes are committed: deferred to the
+        end of a UnitOfWork, immediate on a plain (already committed) connection.
+        """
+        register = getattr(self.connection, 'after_commit', None)
+        if register is not None:
+            register(callback)
+        else:
+            callback()
+
+    def after_rollback(self, callback):
+        """
+        Run callback if this DAO's writes end up rolled back. Only a
+        UnitOfWork can roll back after the DAO returns; on a plain
+        connection the DAO has already committed, so this is a no-op.
+        """
+        register = getattr(self.connection, 'after_rollback', None)
+        if register is not None:
+            register(callback)
+
+    @staticmethod
+    def load_temp_table(cursor, table: str, template_sql: str, columns, rows):
+        """
+        (Re)create #temp table `table` with `template_sql` (a SELECT TOP 0 ...
+        INTO that copies column types) and fill it with fast_executemany.
+        Used by the bulk write paths before a set-based INSERT/MERGE.
+        """
+        cursor.execute(f"""
+        IF OBJECT_ID('tempdb..{table}') IS NOT NULL DROP TABLE {table};
+        {template_sql}
+        """)
+        if rows:
+            cursor.fast_executemany = True
+            placeholders = ", ".join("?" * len(columns))
+            cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
     def execute_query(self, query: str, params: Optional[tuple] = None):
         """
         Execute a SQL query and return the cursor.
@@ -1,6 +1,9 @@
-from typing import List
+from typing import List, Tuple
 from app.daos.base_dao import BaseDAO
 from app.models.committee import Committee
+from app.models.department import Department
+from app.reference_data import reference_data
+from app.search.suggest import suggest_indexes
 import pyodbc
 
 class CommitteeDAO(BaseDAO):
@@ -25,9 +28,61 @@ class CommitteeDAO(BaseDAO):
             if cursor:
                 cursor.close()
 
+    def get_committees_with_departments(self) -> Tuple[List[Committee], List[Department]]:
+        """
+        Retrieve all committees and all departments with one joined query.
+        FULL JOIN keeps committees without departments and departments whose
+        committee row is missing.
+        """
+        query = """
+        SELECT COALESCE(c.coID, d.coID) AS coID, c.Com, d.deID, d.Dep
+        FROM ComTB c
+        FULL OUTER JOIN DepTB d ON d.coID = c.coID
+        ORDER BY COALESCE(c.coID, d.coID) ASC, d.deID ASC
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            committees, departments = [], []
+            seen = set()
+            for row in cursor.fetchall():
+                if row.Com is not None and row.coID not in seen:
+                    seen.add(row.coID)
+                    committees.append(Committee(coID=row.coID, Com=row.Com))
+                if row.deID is not None:
+                    departments.append(Department(deID=row.deID, Dep=row.Dep, coID=row.coID))
+            return committees, departments
+        except pyodbc.Error as e:
+            print(f"Database error in get_committees_with_departments: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
     def insert_committee(self, committee: Committee):
         """
         Insert a new committee into the ComTB table.
         """
-        # Your existing insert_committee logic here
-        pass
\ No newline at end of file
+        # Validate the committee data
+        committee.validate()
+
+        query = "INSERT INTO ComTB (coID, Com) VALUES (?, ?)"
+        params = (committee.coID, committee.Com)
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            self.connection.commit()
+            self.after_commit(reference_data.invalidate)
+            self.after_commit(lambda: suggest_indexes.add(
+                'committee', committee.coID, committee.Com, {"coID": committee.coID, "Com": committee.Com}
+            ))
+            print(f"✅ Committee inserted successfully: {committee}")
+        except pyodbc.Error as e:
+            print(f"❌ Database error in insert_committee: {e}")
+            self.connection.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
\ No newline at end of file
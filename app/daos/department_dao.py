@@ -1,6 +1,8 @@
 from typing import List
 from app.daos.base_dao import BaseDAO
 from app.models.department import Department
+from app.reference_data import reference_data
+from app.search.suggest import suggest_indexes
 import pyodbc
 
 class DepartmentDAO(BaseDAO):
@@ -43,6 +45,11 @@ class DepartmentDAO(BaseDAO):
             cursor = self.connection.cursor()
             cursor.execute(query, params)
             self.connection.commit()
+            self.after_commit(reference_data.invalidate)
+            self.after_commit(lambda: suggest_indexes.add(
+                'department', department.deID, department.Dep,
+                {"deID": department.deID, "Dep": department.Dep, "coID": department.coID}
+            ))
             print(f"✅ Department inserted successfully: {department}")
         except pyodbc.Error as e:
             print(f"❌ Database error in insert_department: {e}")
@@ -50,4 +57,50 @@ class DepartmentDAO(BaseDAO):
             raise
         finally:
             if cursor:
-                cursor.close()
\ No newline at end of file
+                cursor.close()
+
+    def upsert_departments(self, departments: List[Department]) -> List[str]:
+        """
+        Insert or update many departments (keyed by deID) with one MERGE fed
+        from a #temp table loaded with fast_executemany, in the caller's
+        transaction. Returns "inserted" or "updated" per input row.
+        """
+        columns = ("rowNo", "deID", "Dep", "coID")
+        rows = [(index, d.deID, d.Dep, d.coID) for index, d in enumerate(departments)]
+        query = """
+        MERGE DepTB WITH (HOLDLOCK) AS t
+        USING #departmentUpsert AS s ON t.deID = s.deID
+        WHEN MATCHED THEN UPDATE SET Dep = s.Dep, coID = s.coID
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT (deID, Dep, coID) VALUES (s.deID, s.Dep, s.coID)
+        OUTPUT s.rowNo, $action AS mergeAction;
+        """
+
+        results = [None] * len(departments)
+        cursor = None
+        try:
+            cursor = self.raw_connection.cursor()
+            self.load_temp_table(
+                cursor, "#departmentUpsert",
+                "SELECT TOP 0 CAST(0 AS int) AS rowNo, deID, Dep, coID INTO #departmentUpsert FROM DepTB;",
+                columns, rows
+            )
+            cursor.execute(query)
+            for row in cursor.fetchall():
+                results[row.rowNo] = "inserted" if row.mergeAction == 'INSERT' else "updated"
+            cursor.execute("DROP TABLE #departmentUpsert")
+            self.connection.commit()
+        except pyodbc.Error as e:
+            print(f"❌ Database error in upsert_departments: {e}")
+            self.connection.rollback()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+        self.after_commit(reference_data.invalidate)
+        for department in departments:
+            self.after_commit(lambda d=department: suggest_indexes.add(
+                'department', d.deID, d.Dep, {"deID": d.deID, "Dep": d.Dep, "coID": d.coID}
+            ))
+        return results
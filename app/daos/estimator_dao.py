@@ -1,6 +1,9 @@
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 from app.daos.base_dao import BaseDAO
+from app.daos.row_mapper import mapper_for
 from app.models.estimator import Estimator
+from app.search.suggest import suggest_indexes
+from app.cache import estimator_workload_cache
 import pyodbc
 
 class EstimatorDAO(BaseDAO):
@@ -10,18 +13,57 @@ class EstimatorDAO(BaseDAO):
         """
         super().__init__(connection)  # Pass the connection to BaseDAO
 
-    def get_all_estimators(self) -> List[Estimator]:
+    # Columns clients may select with ?fields=
+    FIELDS = ("estimatorID", "estimatorName", "startDate", "endDate", "estimatorStatus", "coID", "deID")
+
+    def get_all_estimators(self, coID: Optional[int] = None, deID: Optional[int] = None,
+                           estimatorStatus: Optional[bool] = None, active_on=None,
+                           after_id: Optional[int] = None, limit: Optional[int] = None,
+                           fields: Optional[Sequence[str]] = None) -> List[Estimator]:
         """
-        Retrieve all estimators from the estimatorsTable.
+        Retrieve estimators from the estimatorsTable, filtered in SQL.
+        active_on keeps estimators whose startDate..endDate window contains
+        that date (open-ended when endDate is NULL). Rows come in estimatorID
+        order; pass the last ID as after_id for the next page. Unselected
+        fields are left as None (estimatorID and the required estimatorName
+        are always read).
         """
-        query = "SELECT  estimatorName,startDate,endDate,estimatorStatus,coID,deID  FROM estimatorsTable"
+        always = ("estimatorID", "estimatorName")
+        columns = [name for name in self.FIELDS if fields is None or name in fields or name in always]
+
+        conditions, params = [], []
+        if coID is not None:
+            conditions.append("coID = ?")
+            params.append(coID)
+        if deID is not None:
+            conditions.append("deID = ?")
+            params.append(deID)
+        if estimatorStatus is not None:
+            conditions.append("estimatorStatus = ?")
+            params.append(estimatorStatus)
+        if active_on is not None:
+            conditions.append("(startDate IS NULL OR startDate <= ?) AND (endDate IS NULL OR endDate >= ?)")
+            params.extend((active_on, active_on))
+        if after_id is not None:
+            conditions.append("estimatorID > ?")
+            params.append(after_id)
+
+        top = ""
+        if limit is not None:
+            top = "TOP (?) "
+            params.insert(0, limit)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {top}{', '.join(columns)} FROM estimatorsTable {where} ORDER BY estimatorID"
         cursor = None
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
             rows = cursor.fetchall()
-            print(f"type of rows...{type(rows)}")
-            return [Estimator( estimatorName=row.estimatorName, startDate=row.startDate, endDate=row.endDate, estimatorStatus=row.estimatorStatus,coID =row.coID,deID=row.deID) for row in rows]
+            return mapper_for(query, cursor, Estimator).map_all(rows)
         except pyodbc.Error as e:
             print(f"Database error in get_all_estimators: {e}")
             raise
@@ -29,6 +71,134 @@ class EstimatorDAO(BaseDAO):
             if cursor:
                 cursor.close()
 
+    def get_estimator_names(self) -> List[Tuple[int, str]]:
+        """
+        Retrieve (estimatorID, estimatorName) pairs for the lookup index.
+        """
+        query = "SELECT estimatorID, estimatorName FROM estimatorsTable"
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            return [(row.estimatorID, row.estimatorName) for row in cursor.fetchall()]
+        except pyodbc.Error as e:
+            print(f"Database error in get_estimator_names: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_workload(self, done_status: str, cancelled_status: str) -> List[dict]:
+        """
+        Per-estimator order counts (open / finished / cancelled) and the age
+        in days of the oldest open order, from one grouped pass over orderTable.
+        Any status other than done/cancelled counts as open.
+        """
+        open_case = "(o.orderStatus IS NULL OR o.orderStatus NOT IN (?, ?))"
+        query = f"""
+        SELECT
+            o.estimatorID,
+            MAX(e.estimatorName) AS estimatorName,
+            SUM(CASE WHEN {open_case} THEN 1 ELSE 0 END) AS openOrders,
+            SUM(CASE WHEN o.orderStatus = ? THEN 1 ELSE 0 END) AS finishedOrders,
+            SUM(CASE WHEN o.orderStatus = ? THEN 1 ELSE 0 END) AS cancelledOrders,
+            DATEDIFF(day, MIN(CASE WHEN {open_case} THEN o.orderDate END), CAST(GETDATE() AS date)) AS oldestOpenDays
+        FROM [dbo].[orderTable] o
+        LEFT JOIN estimatorsTable e ON e.estimatorID = o.estimatorID
+        WHERE o.estimatorID IS NOT NULL
+        GROUP BY o.estimatorID
+        ORDER BY openOrders DESC, o.estimatorID
+        """
+        params = (done_status, cancelled_status, done_status, cancelled_status, done_status, cancelled_status)
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, params)
+            return [
+                {
+                    "estimatorID": row.estimatorID,
+                    "estimatorName": row.estimatorName,
+                    "openOrders": row.openOrders,
+                    "finishedOrders": row.finishedOrders,
+                    "cancelledOrders": row.cancelledOrders,
+                    "oldestOpenDays": row.oldestOpenDays,
+                }
+                for row in cursor.fetchall()
+            ]
+        except pyodbc.Error as e:
+            print(f"Database error in get_workload: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def upsert_estimators(self, estimators: List[Estimator]) -> List[dict]:
+        """
+        Insert or update many estimators with one MERGE fed from a #temp table
+        (loaded with fast_executemany), in the caller's transaction.
+        Rows with an estimatorID update that estimator; rows without one are
+        inserted. Returns, per input row, {"action", "estimatorID"} where
+        action is "inserted", "updated" or "not_found".
+        """
+        columns = ("rowNo", "estimatorID", "estimatorName", "startDate", "endDate", "estimatorStatus", "coID", "deID")
+        rows = [
+            (index, e.estimatorID, e.estimatorName, e.startDate, e.endDate or None, e.estimatorStatus, e.coID, e.deID)
+            for index, e in enumerate(estimators)
+        ]
+        query = """
+        MERGE estimatorsTable WITH (HOLDLOCK) AS t
+        USING #estimatorUpsert AS s ON t.estimatorID = s.estimatorID
+        WHEN MATCHED THEN UPDATE SET
+            estimatorName = s.estimatorName,
+            startDate = s.startDate,
+            endDate = s.endDate,
+            estimatorStatus = s.estimatorStatus,
+            coID = s.coID,
+            deID = s.deID
+        WHEN NOT MATCHED BY TARGET AND s.estimatorID IS NULL THEN
+            INSERT (estimatorName, startDate, endDate, estimatorStatus, coID, deID)
+            VALUES (s.estimatorName, s.startDate, s.endDate, s.estimatorStatus, s.coID, s.deID)
+        OUTPUT s.rowNo, $action AS mergeAction, inserted.estimatorID;
+        """
+
+        results = [{"action": "not_found", "estimatorID": e.estimatorID} for e in estimators]
+        cursor = None
+        try:
+            cursor = self.raw_connection.cursor()
+            # estimatorID is cast so the temp table doesn't inherit the IDENTITY
+            self.load_temp_table(
+                cursor, "#estimatorUpsert",
+                "SELECT TOP 0 CAST(0 AS int) AS rowNo, CAST(NULL AS int) AS estimatorID, estimatorName, "
+                "startDate, endDate, estimatorStatus, coID, deID INTO #estimatorUpsert FROM estimatorsTable;",
+                columns, rows
+            )
+            cursor.execute(query)
+            for row in cursor.fetchall():
+                results[row.rowNo] = {
+                    "action": "inserted" if row.mergeAction == 'INSERT' else "updated",
+                    "estimatorID": row.estimatorID
+                }
+            cursor.execute("DROP TABLE #estimatorUpsert")
+            self.connection.commit()
+        except pyodbc.Error as e:
+            self.connection.rollback()
+            print(f"Database error in upsert_estimators: {str(e)}")
+            raise ValueError(f"Database error: {str(e)}")
+        finally:
+            if cursor:
+                cursor.close()
+
+        for estimator, result in zip(estimators, results):
+            if result["action"] != "not_found":
+                self._index_estimator(result["estimatorID"], estimator.estimatorName)
+        self.after_commit(estimator_workload_cache.clear)
+        return results
+
+    def _index_estimator(self, estimator_id: int, name: str):
+        """Keep the lookup index current once the write is committed"""
+        self.after_commit(lambda: suggest_indexes.add(
+            'estimator', estimator_id, name, {"estimatorID": estimator_id, "estimatorName": name}
+        ))
 
     def insert_estimator(self, estimator: Estimator) -> int:
         """
@@ -68,6 +238,7 @@ class EstimatorDAO(BaseDAO):
             
             estimator_id = result[0]
             self.connection.commit()
+            self._index_estimator(estimator_id, estimator.estimatorName)
             return estimator_id
             
         except pyodbc.Error as e:
@@ -122,6 +293,8 @@ class EstimatorDAO(BaseDAO):
                 return False
                 
             self.connection.commit()
+            self._index_estimator(estimator_id, updated_estimator.estimatorName)
+            self.after_commit(estimator_workload_cache.clear)
             return True
             
         except pyodbc.Error as e:
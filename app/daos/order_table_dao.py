@@ -1,10 +1,38 @@
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 from app.daos.base_dao import BaseDAO
-from app.models.order_table import OrderTable
+from app.daos.row_mapper import mapper_for
+from app.cache import order_stats_cache, estimator_workload_cache
+from app.search.order_index import order_search_index
+from app.models.order_table import OrderTable, ORDER_STATUS_DONE, ORDER_STATUS_CANCELLED
 import pyodbc
 from app.models.order_table import OrderDetails
 
 class OrderTableDAO(BaseDAO):
+    # Columns written on insert, in _insert_values() order
+    INSERT_COLUMNS = (
+        "orderNo", "orderYear", "orderDate", "orderType", "coID", "deID", "materialName", "estimatorID",
+        "procedureID", "orderStatus", "notes", "achievedOrderDate", "priceRequestedDestination",
+        "finalPrice", "currencyType", "color", "checkOrderLink", "userID",
+    )
+
+    # Columns returned by list_orders (covered by IX_orderTable_orderYear_orderID)
+    LIST_COLUMNS = (
+        "orderID", "orderNo", "orderYear", "orderDate", "orderType", "coID", "deID", "materialName",
+        "estimatorID", "orderStatus", "color", "finalPrice", "currencyType",
+    )
+
+    # Filter name -> SQL predicate, for list_orders
+    LIST_FILTERS = {
+        "coID": "coID = ?",
+        "deID": "deID = ?",
+        "estimatorID": "estimatorID = ?",
+        "orderStatus": "orderStatus = ?",
+        "color": "color = ?",
+        "orderYear": "orderYear = ?",
+        "dateFrom": "orderDate >= ?",
+        "dateTo": "orderDate <= ?",
+    }
+
     def __init__(self, connection):
         """
         Initialize the DAO with a database connection.
@@ -34,62 +62,91 @@ class OrderTableDAO(BaseDAO):
             if cursor:
                 cursor.close()
 
-    def insert_order(self, order: OrderTable) -> int:
+    @staticmethod
+    def _is_duplicate_key(error: pyodbc.Error) -> bool:
+        """True for SQL Server unique index (2601) / unique constraint (2627) violations"""
+        return isinstance(error, pyodbc.IntegrityError) and ('2601' in str(error) or '2627' in str(error))
+
+    @staticmethod
+    def _insert_values(order: OrderTable) -> tuple:
         """
-        Insert a new order into the database and return the orderID.
+        Column values for INSERT_COLUMNS with defaults applied
+        (cunnrentDate is always GETDATE() and is not included).
         """
-        # Check if the order already exists
-        if self.check_order_exists(order.orderNo, order.orderYear):
-            raise ValueError(f"Order with orderNo '{order.orderNo}' and orderYear '{order.orderYear}' already exists.")
-
         # Set default values if not provided
         notes = order.notes if order.notes else 'لا توجد ملاحظات'
         checkOrderLink = order.checkOrderLink if order.checkOrderLink is not None else False
         finalPrice = order.finalPrice if order.finalPrice else '0'
         procedureID = order.procedureID if order.procedureID else 1
-        color = 'GREEN' if order.orderStatus == 'منجز' else 'RED' if order.orderStatus == 'الغيت' else 'YELLOW'
+        color = 'GREEN' if order.orderStatus == ORDER_STATUS_DONE else 'RED' if order.orderStatus == ORDER_STATUS_CANCELLED else 'YELLOW'
 
-        # Use OUTPUT INSERTED.orderID to get the new order ID directly
+        return (
+            order.orderNo, order.orderYear, order.orderDate, order.orderType, order.coID, order.deID, 
+            order.materialName, order.estimatorID, procedureID, order.orderStatus, notes, 
+            order.achievedOrderDate, order.priceRequestedDestination, finalPrice, order.currencyType, 
+            color, checkOrderLink, order.userID
+        )
+
+    def insert_order(self, order: OrderTable) -> OrderTable:
+        """
+        Insert a new order in a single statement and return the inserted row.
+        Raises ValueError if (orderNo, orderYear) already exists.
+        """
+        duplicate_message = f"Order with orderNo '{order.orderNo}' and orderYear '{order.orderYear}' already exists."
+
+        # The duplicate check and the insert are one round trip: UPDLOCK/HOLDLOCK
+        # key-range locks (orderNo, orderYear) so concurrent callers serialize,
+        # and UQ_orderTable_orderNo_orderYear backs it up. OUTPUT INSERTED.*
+        # returns the whole row, so callers don't need a follow-up read.
         insert_query = """
         INSERT INTO [dbo].[orderTable] (
             orderNo, orderYear, orderDate, orderType, coID, deID, materialName, estimatorID, procedureID, 
             orderStatus, notes, achievedOrderDate, priceRequestedDestination, finalPrice, currencyType, 
             cunnrentDate, color, checkOrderLink, userID
         ) 
-        OUTPUT INSERTED.orderID  -- Fetch the new ID immediately
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), ?, ?, ?);
+        OUTPUT INSERTED.*
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM [dbo].[orderTable] WITH (UPDLOCK, HOLDLOCK)
+            WHERE orderNo = ? AND orderYear = ?
+        );
         """
 
-        params = (
-            order.orderNo, order.orderYear, order.orderDate, order.orderType, order.coID, order.deID, 
-            order.materialName, order.estimatorID, procedureID, order.orderStatus, notes, 
-            order.achievedOrderDate, order.priceRequestedDestination, finalPrice, order.currencyType, 
-            color, checkOrderLink, order.userID
-        )
+        params = self._insert_values(order) + (order.orderNo, order.orderYear)
 
         cursor = None
         try:
             cursor = self.connection.cursor()
-
-            # Execute the query and get the inserted orderID
-            print("Executing INSERT query with OUTPUT INSERTED.orderID...")
             cursor.execute(insert_query, params)
-            result = cursor.fetchone()
+            row = cursor.fetchone()
+
+            if not row:
+                # NOT EXISTS filtered the row out
+                raise ValueError(duplicate_message)
 
-            if not result or result[0] is None:
-                raise ValueError("Failed to retrieve orderID using OUTPUT INSERTED.orderID.")
+            inserted = mapper_for(insert_query, cursor, OrderTable)(row)
+            if inserted.orderID is None:
+                raise ValueError("Failed to retrieve orderID using OUTPUT INSERTED.*.")
 
-            orderID = int(result[0])
-            print(f"✅ Order inserted successfully with orderID: {orderID}")
+            print(f"✅ Order inserted successfully with orderID: {inserted.orderID}")
 
             # Commit the transaction
             self.connection.commit()
+            self.after_commit(order_stats_cache.clear)
+            self.after_commit(estimator_workload_cache.clear)
+            self.after_commit(lambda: order_search_index.add(inserted.orderID, inserted.materialName, inserted.notes))
 
-            return orderID
+            return inserted
+
+        except ValueError:
+            self.connection.rollback()
+            raise
 
         except pyodbc.Error as e:
-            print(f"❌ Database error in insert_order: {e}")
             self.connection.rollback()
+            if self._is_duplicate_key(e):
+                raise ValueError(duplicate_message)
+            print(f"❌ Database error in insert_order: {e}")
             raise ValueError(f"Database error: {e}")
 
         except Exception as e:
@@ -101,6 +158,244 @@ class OrderTableDAO(BaseDAO):
             if cursor:
                 cursor.close()
 
+    def insert_orders_bulk(self, orders: List[OrderTable], chunk_size: int = 500) -> List[Union[int, str]]:
+        """
+        Insert many orders, one transaction per chunk.
+
+        Each chunk is loaded into a #temp table with fast_executemany and moved
+        into orderTable with one INSERT ... SELECT that skips existing
+        (orderNo, orderYear) keys. Returns, per input order, the new orderID
+        or an error message.
+        """
+        results: List[Union[int, str]] = [None] * len(orders)
+
+        # Duplicates inside the batch itself never reach the database
+        first_seen = {}
+        for index, order in enumerate(orders):
+            key = (str(order.orderNo), str(order.orderYear))
+            if key in first_seen:
+                results[index] = f"Duplicate of row {first_seen[key] + 1} in this import"
+            else:
+                first_seen[key] = index
+
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            self.after_commit(order_stats_cache.clear)
+            self.after_commit(estimator_workload_cache.clear)
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                inserted = self._insert_chunk([(index, orders[index]) for index in chunk])
+                self.commit_now()
+            except pyodbc.Error as e:
+                print(f"❌ Database error in insert_orders_bulk: {e}")
+                self.raw_connection.rollback()
+                for index in chunk:
+                    results[index] = f"Database error: {e}"
+                continue
+
+            indexed = []
+            for index in chunk:
+                order = orders[index]
+                order_id = inserted.get((str(order.orderNo), str(order.orderYear)))
+                results[index] = order_id if order_id is not None else (
+                    f"Order with orderNo '{order.orderNo}' and orderYear '{order.orderYear}' already exists."
+                )
+                if order_id is not None:
+                    indexed.append((order_id, order.materialName, order.notes))
+            self.after_commit(lambda docs=indexed: [order_search_index.add(*doc) for doc in docs])
+
+        return results
+
+    def _insert_chunk(self, rows) -> dict:
+        """Load one chunk through #orderImport; returns {(orderNo, orderYear): orderID}"""
+        columns = ", ".join(self.INSERT_COLUMNS)
+        cursor = None
+        try:
+            cursor = self.raw_connection.cursor()
+
+            # Copy column types from orderTable without its IDENTITY or rows
+            self.load_temp_table(
+                cursor, "#orderImport",
+                f"SELECT TOP 0 {columns} INTO #orderImport FROM [dbo].[orderTable];",
+                self.INSERT_COLUMNS,
+                [self._insert_values(order) for _, order in rows]
+            )
+
+            cursor.execute(f"""
+            INSERT INTO [dbo].[orderTable] ({columns}, cunnrentDate)
+            OUTPUT INSERTED.orderID, INSERTED.orderNo, INSERTED.orderYear
+            SELECT {columns}, GETDATE()
+            FROM #orderImport i
+            WHERE NOT EXISTS (
+                SELECT 1 FROM [dbo].[orderTable] o WITH (UPDLOCK, HOLDLOCK)
+                WHERE o.orderNo = i.orderNo AND o.orderYear = i.orderYear
+            );
+            """)
+            inserted = {(str(row.orderNo), str(row.orderYear)): int(row.orderID) for row in cursor.fetchall()}
+
+            cursor.execute("DROP TABLE #orderImport")
+            return inserted
+        finally:
+            if cursor:
+                cursor.close()
+
+    def list_orders(self, filters: dict, after: Optional[tuple] = None, limit: int = 50) -> List[OrderTable]:
+        """
+        One page of orders, newest first, using keyset (seek) pagination on
+        (orderYear, orderID). `after` is the (orderYear, orderID) of the last
+        row of the previous page; `filters` keys come from LIST_FILTERS.
+        """
+        conditions, params = [], []
+        for name, value in filters.items():
+            if value is not None:
+                conditions.append(self.LIST_FILTERS[name])
+                params.append(value)
+
+        if after is not None:
+            conditions.append("(orderYear < ? OR (orderYear = ? AND orderID < ?))")
+            params.extend((after[0], after[0], after[1]))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+        SELECT TOP (?) {", ".join(self.LIST_COLUMNS)}
+        FROM [dbo].[orderTable]
+        {where}
+        ORDER BY orderYear DESC, orderID DESC
+        """
+
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, [limit] + params)
+            rows = cursor.fetchall()
+            return mapper_for(query, cursor, OrderTable).map_all(rows)
+        except pyodbc.Error as e:
+            print(f"Database error in list_orders: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    # Dimensions reported by get_order_stats, in GROUPING SETS order
+    STATS_DIMENSIONS = ("orderStatus", "color", "orderYear", "coID", "currencyType")
+
+    def get_order_stats(self) -> dict:
+        """
+        Order counts broken down by each of STATS_DIMENSIONS, plus totals,
+        from a single scan using GROUPING SETS.
+        """
+        dims = self.STATS_DIMENSIONS
+        query = f"""
+        SELECT {", ".join(dims)},
+            {", ".join(f"GROUPING({dim}) AS g_{dim}" for dim in dims)},
+            COUNT(*) AS total,
+            COUNT(orderNo) AS totalOrderNo
+        FROM [dbo].[orderTable]
+        GROUP BY GROUPING SETS ({", ".join(f"({dim})" for dim in dims)}, ())
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query)
+            stats = {"total": 0, "countAllOrderNo": 0}
+            for dim in dims:
+                stats[dim] = []
+            for row in cursor.fetchall():
+                grouped = [dim for dim in dims if getattr(row, f"g_{dim}") == 0]
+                if not grouped:
+                    # The () grouping set: grand totals
+                    stats["total"] = row.total
+                    stats["countAllOrderNo"] = row.totalOrderNo
+                else:
+                    dim = grouped[0]
+                    stats[dim].append({"value": getattr(row, dim), "count": row.total})
+            for dim in dims:
+                stats[dim].sort(key=lambda item: item["count"], reverse=True)
+            return stats
+        except pyodbc.Error as e:
+            print(f"Database error in get_order_stats: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def iter_search_documents(self, batch_size: int = 5000) -> Iterator[tuple]:
+        """Stream (orderID, materialName, notes) for building the search index"""
+        query = "SELECT orderID, materialName, notes FROM [dbo].[orderTable]"
+        cursor = None
+        try:
+            # Private cursor: the shared request cursor must stay free while we stream
+            cursor = self.raw_connection.cursor()
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row.orderID, row.materialName, row.notes
+        except pyodbc.Error as e:
+            print(f"Database error in iter_search_documents: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    # (header, SQL expression) pairs for iter_orders_for_export
+    EXPORT_COLUMNS = (
+        ("orderID", "o.orderID"),
+        ("orderNo", "o.orderNo"),
+        ("orderYear", "o.orderYear"),
+        ("orderDate", "o.orderDate"),
+        ("orderType", "o.orderType"),
+        ("committee", "c.Com"),
+        ("department", "d.Dep"),
+        ("procedureName", "p.procedureName"),
+        ("materialName", "o.materialName"),
+        ("estimatorID", "o.estimatorID"),
+        ("orderStatus", "o.orderStatus"),
+        ("achievedOrderDate", "o.achievedOrderDate"),
+        ("priceRequestedDestination", "o.priceRequestedDestination"),
+        ("finalPrice", "o.finalPrice"),
+        ("currencyType", "o.currencyType"),
+        ("notes", "o.notes"),
+    )
+
+    def iter_orders_for_export(self, order_year: Optional[str] = None, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Stream export rows (EXPORT_COLUMNS order) joined with committee,
+        department and procedure names, batch_size rows at a time, so memory
+        stays flat however many rows match.
+        """
+        query = f"""
+        SELECT {", ".join(expr for _, expr in self.EXPORT_COLUMNS)}
+        FROM dbo.orderTable o
+        LEFT JOIN dbo.proceduresTable p ON p.procedureID = o.procedureID
+        LEFT JOIN dbo.ComTB c ON o.coID = c.coID
+        LEFT JOIN dbo.DepTB d ON o.deID = d.deID
+        {"WHERE o.orderYear = ?" if order_year else ""}
+        ORDER BY o.orderYear, o.orderID
+        """
+        cursor = None
+        try:
+            cursor = self.raw_connection.cursor()
+            if order_year:
+                cursor.execute(query, (order_year,))
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield tuple(row)
+        except pyodbc.Error as e:
+            print(f"Database error in iter_orders_for_export: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
     def count_all_order_no(self) -> int:
         """
         Count all orderNo in the orderTable.
@@ -126,25 +421,33 @@ class OrderTableDAO(BaseDAO):
     # app/daos/order_table_dao.py
 
 
-    def get_order_details(self, order_id: int) -> Optional[OrderDetails]:
-        """
-        Get complete order details with joins
-        Returns None if order not found
-        """
-        query = """
-        SELECT 
-            o.*,
-            p.procedureName,
-            ISNULL(c.Com, 'no com') AS committee,
-            ISNULL(d.Dep, 'no dep') AS department,
-            u.username
+    # Explicit projection for the details read path (no o.*)
+    DETAILS_COLUMNS = (
+        "o.orderID", "o.orderNo", "o.orderYear", "o.orderDate", "o.orderType", "o.coID", "o.deID",
+        "o.materialName", "o.estimatorID", "o.procedureID", "o.orderStatus", "o.notes",
+        "o.achievedOrderDate", "o.priceRequestedDestination", "o.finalPrice", "o.currencyType",
+        "o.cunnrentDate", "o.color", "o.checkOrderLink", "o.userID",
+        "p.procedureName",
+        "ISNULL(c.Com, 'no com') AS committee",
+        "ISNULL(d.Dep, 'no dep') AS department",
+        "u.username",
+    )
+
+    DETAILS_QUERY = f"""
+        SELECT {", ".join(DETAILS_COLUMNS)}
         FROM dbo.orderTable o
         INNER JOIN dbo.proceduresTable p ON p.procedureID = o.procedureID
         LEFT JOIN dbo.ComTB c ON o.coID = c.coID
         LEFT JOIN dbo.DepTB d ON o.deID = d.deID
         LEFT JOIN dbo.users u ON o.userID = u.id
-        WHERE o.orderID = ?
         """
+
+    def get_order_details(self, order_id: int) -> Optional[OrderDetails]:
+        """
+        Get complete order details with joins
+        Returns None if order not found
+        """
+        query = self.DETAILS_QUERY + "WHERE o.orderID = ?"
         
         cursor = None
         try:
@@ -155,34 +458,7 @@ class OrderTableDAO(BaseDAO):
             if not row:
                 return None
                 
-            # Create OrderDetails instance with all fields
-            return OrderDetails(
-                # Original OrderTable fields
-                orderNo=row.orderNo,
-                orderYear=row.orderYear,
-                orderDate=row.orderDate,
-                orderType=row.orderType,
-                coID=row.coID,
-                deID=row.deID,
-                materialName=row.materialName,
-                estimatorID=row.estimatorID,
-                procedureID=row.procedureID,
-                orderStatus=row.orderStatus,
-                notes=row.notes,
-                achievedOrderDate=row.achievedOrderDate,
-                priceRequestedDestination=row.priceRequestedDestination,
-                finalPrice=row.finalPrice,
-                currencyType=row.currencyType,
-                cunnrentDate=row.cunnrentDate,
-                color=row.color,
-                checkOrderLink=row.checkOrderLink,
-                userID=row.userID,
-                # Joined fields
-                procedureName=row.procedureName,
-                committee=row.committee,
-                department=row.department,
-                username=row.username
-            )
+            return mapper_for(query, cursor, OrderDetails)(row)
             
         except pyodbc.Error as e:
             print(f"Database error in get_order_details: {str(e)}")
@@ -190,4 +466,64 @@ class OrderTableDAO(BaseDAO):
         finally:
             if cursor:
                 cursor.close()
-    
\ No newline at end of file
+
+    def get_order_version(self, order_id: int) -> Optional[bytes]:
+        """
+        Version token for the order's details, or None if not found: the
+        order's rowversion plus a hash of the joined names (procedure,
+        committee, department, user), which live in tables without one.
+        Key lookups only; used for ETags without building the details row.
+        """
+        query = """
+        SELECT o.rowVersion,
+               HASHBYTES('SHA2_256', CONCAT(
+                   p.procedureName, NCHAR(31), c.Com, NCHAR(31), d.Dep, NCHAR(31), u.username
+               )) AS joinedHash
+        FROM [dbo].[orderTable] o
+        INNER JOIN dbo.proceduresTable p ON p.procedureID = o.procedureID
+        LEFT JOIN dbo.ComTB c ON o.coID = c.coID
+        LEFT JOIN dbo.DepTB d ON o.deID = d.deID
+        LEFT JOIN dbo.users u ON o.userID = u.id
+        WHERE o.orderID = ?
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, (order_id,))
+            row = cursor.fetchone()
+            return bytes(row[0]) + bytes(row[1]) if row else None
+        except pyodbc.Error as e:
+            print(f"Database error in get_order_version: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_order_details_many(self, order_ids: Iterable[int], chunk_size: int = 500) -> Dict[int, OrderDetails]:
+        """
+        Get details for many orders at once, keyed by orderID.
+        IDs are sent as chunked IN lists to stay under SQL Server's 2100
+        parameter limit; missing IDs are simply absent from the result.
+        """
+        ids = list(dict.fromkeys(order_ids))  # de-duplicate, keep order
+        details: Dict[int, OrderDetails] = {}
+
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                placeholders = ", ".join("?" * len(chunk))
+                query = self.DETAILS_QUERY + f"WHERE o.orderID IN ({placeholders})"
+                cursor.execute(query, chunk)
+                to_details = mapper_for(query, cursor, OrderDetails)
+                for row in cursor.fetchall():
+                    item = to_details(row)
+                    details[item.orderID] = item
+            return details
+        except pyodbc.Error as e:
+            print(f"Database error in get_order_details_many: {str(e)}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
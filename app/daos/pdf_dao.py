@@ -1,72 +1,330 @@
 # app/daos/pdf_dao.py
-import os
 from typing import List, Optional
 from app.daos.base_dao import BaseDAO
 from app.models.pdf_table import PdfTable
+from app.storage.backends import StorageBackend
+from app.storage.layout import PdfLayout
+from app.cache import pdf_location_cache
+from app.storage.uploads import SpooledUpload
 import pyodbc
 
 class PdfDAO(BaseDAO):
     def __init__(self, connection):
         super().__init__(connection)
 
-    def get_next_count(self, order_id: int) -> int:
-        """Get next countPdf number for an order"""
-        query = "SELECT MAX(countPdf) FROM dbo.pdfTable WHERE orderID = ?"
-        cursor = self.connection.cursor()
-        cursor.execute(query, (order_id,))
-        max_count = cursor.fetchone()[0]
-        return (max_count or 0) + 1
-
-    def insert_pdf(self, pdf: PdfTable, file_content: bytes, base_path: str) -> int:
-        """Save PDF file and insert record"""
-        # Get next count number
-        pdf.countPdf = self.get_next_count(pdf.orderID)
-        
-        # Construct filename and full path
-        filename = f"{pdf.orderNo}.{pdf.orderYear}.{pdf.countPdf}.pdf"
-        pdf.pdf = os.path.join(base_path, filename)
-        
-        # Ensure base directory exists
-        os.makedirs(base_path, exist_ok=True)
-        
-        # Save file
-        with open(pdf.pdf, 'wb') as f:
-            f.write(file_content)
-        
-        # Insert database record
+    # Drop the row and its blob reference; blobs nobody references any more
+    # are deleted in the same batch and their files removed after commit.
+    DELETE_QUERY = """
+    SET NOCOUNT ON;
+    DECLARE @gone TABLE (pdf NVARCHAR(400), sha256 CHAR(64));
+    DECLARE @orphans TABLE (sha256 CHAR(64));
+
+    DELETE FROM dbo.pdfTable
+    OUTPUT DELETED.pdf, DELETED.sha256 INTO @gone
+    WHERE pdfID = ?;
+
+    UPDATE b SET refCount = b.refCount - 1
+    FROM dbo.pdfBlobs AS b
+    JOIN @gone AS g ON g.sha256 = b.sha256;
+
+    DELETE FROM dbo.pdfBlobs
+    OUTPUT DELETED.sha256 INTO @orphans
+    WHERE refCount <= 0 AND sha256 IN (SELECT sha256 FROM @gone);
+
+    SELECT g.pdf, g.sha256, CAST(CASE WHEN o.sha256 IS NULL THEN 0 ELSE 1 END AS BIT)
+    FROM @gone AS g LEFT JOIN @orphans AS o ON o.sha256 = g.sha256;
+    """
+
+    LOCATION_QUERY = """
+    SELECT pdfID, orderID, orderNo, orderYear, countPdf, pdf, sha256
+    FROM dbo.pdfTable
+    """
+
+    def _get_location(self, where: str, params: tuple) -> Optional[PdfTable]:
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"{self.LOCATION_QUERY} WHERE {where}", params)
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return PdfTable(
+                pdfID=row.pdfID,
+                orderID=row.orderID,
+                orderNo=row.orderNo,
+                orderYear=row.orderYear,
+                countPdf=row.countPdf,
+                pdf=row.pdf,
+                sha256=row.sha256,
+            )
+        finally:
+            if cursor:
+                cursor.close()
+
+    def get_pdf_location(self, pdf_id: int) -> Optional[PdfTable]:
+        """Where a PDF is stored, by pdfID (primary key seek)"""
+        return self._get_location("pdfID = ?", (pdf_id,))
+
+    def get_pdf_location_by_count(self, order_id: int, count_pdf: int) -> Optional[PdfTable]:
+        """Where an order's n-th PDF is stored (UQ_pdfTable_orderID_countPdf seek)"""
+        return self._get_location("orderID = ? AND countPdf = ?", (order_id, count_pdf))
+
+    def list_pdfs(self, order_id: int) -> List[PdfTable]:
+        """
+        All PDFs of an order in countPdf order: one seek on the covering
+        index, plus a primary key seek per row on pdfBlobs for the size
+        (NULL for rows not yet deduplicated and blobs older than sizeBytes).
+        """
         query = """
-        INSERT INTO dbo.pdfTable (
-            orderID, orderNo, orderYear, countPdf, pdf
-        ) 
-        OUTPUT INSERTED.pdfID
-        VALUES (?, ?, ?, ?, ?)
+        SELECT p.pdfID, p.countPdf, p.sha256, p.uploadedAt, p.pdf, b.sizeBytes
+        FROM dbo.pdfTable AS p
+        LEFT JOIN dbo.pdfBlobs AS b ON b.sha256 = p.sha256
+        WHERE p.orderID = ?
+        ORDER BY p.countPdf
         """
-        
-        params = (
-            pdf.orderID,
-            pdf.orderNo,
-            pdf.orderYear,
-            pdf.countPdf,
-            pdf.pdf
-        )
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(query, (order_id,))
+            return [
+                PdfTable(
+                    pdfID=row.pdfID,
+                    orderID=order_id,
+                    countPdf=row.countPdf,
+                    sha256=row.sha256,
+                    uploadedAt=row.uploadedAt,
+                    pdf=row.pdf,
+                    sizeBytes=row.sizeBytes,
+                )
+                for row in cursor.fetchall()
+            ]
+        finally:
+            if cursor:
+                cursor.close()
 
+    @staticmethod
+    def _delete_quietly(storage: StorageBackend, key: str):
+        try:
+            storage.delete(key)
+        except Exception as e:
+            print(f"❌ Could not delete blob {key}: {e}")
+
+    @staticmethod
+    def _known_blob_paths(cursor, hashes) -> dict:
+        """blobPath of the hashes pdfBlobs already has (plain read, no locks kept)"""
+        hashes = list(hashes)
+        placeholders = ", ".join("?" * len(hashes))
+        cursor.execute(f"SELECT sha256, blobPath FROM dbo.pdfBlobs WHERE sha256 IN ({placeholders})", hashes)
+        return {row.sha256: row.blobPath for row in cursor.fetchall()}
+
+    @staticmethod
+    def _put_if_missing(storage: StorageBackend, key: str, upload: SpooledUpload) -> bool:
+        """Store the upload under key unless the blob is already there; True if it was written"""
+        if storage.exists(key):
+            return False
+        storage.put_file(key, upload.path)
+        return True
+
+    @staticmethod
+    def _settle_blob(storage: StorageBackend, key: str, blob_path: str, written: bool,
+                     upload: SpooledUpload) -> bool:
+        """
+        Make sure the blob the MERGE points at exists, when pdfBlobs changed
+        between the lookup and the MERGE (a racing upload, delete or rollback
+        of the same content). Rare; the only storage call made under the locks.
+        Returns True if the upload was written to blob_path here.
+        """
+        if not written:
+            return PdfDAO._put_if_missing(storage, blob_path, upload)
+        if blob_path != key:
+            # Our copy went to another key, which nothing references
+            if storage.exists(blob_path):
+                PdfDAO._delete_quietly(storage, key)
+            else:
+                storage.move(key, blob_path)
+        return False
+
+    # One round trip over #pdfBatch (rowNo, sha256, blobPath, sizeBytes):
+    # take one reference per row on each distinct blob (creating its row on
+    # first sight), then insert the pdfTable rows. The count range is
+    # allocated inside the INSERT from a single MAX(countPdf): the
+    # UPDLOCK/HOLDLOCK range lock on the order's rows makes concurrent
+    # uploads for one order queue up until the first transaction ends, so
+    # two uploads never get the same count. The HOLDLOCK on the MERGE does
+    # the same for two uploads of one new hash. The blobs themselves are
+    # stored before this runs, never under these locks.
+    INSERT_BATCH_QUERY = """
+    SET NOCOUNT ON;
+    DECLARE @blobs TABLE (mergeAction NVARCHAR(10), sha256 CHAR(64), blobPath NVARCHAR(400));
+    DECLARE @rows TABLE (pdfID INT, countPdf INT, sha256 CHAR(64));
+
+    MERGE dbo.pdfBlobs WITH (HOLDLOCK) AS target
+    USING (
+        SELECT sha256, MIN(blobPath) AS blobPath, MIN(sizeBytes) AS sizeBytes, COUNT(*) AS refs
+        FROM #pdfBatch GROUP BY sha256
+    ) AS source
+        ON target.sha256 = source.sha256
+    WHEN MATCHED THEN
+        UPDATE SET refCount = target.refCount + source.refs,
+                   sizeBytes = ISNULL(target.sizeBytes, source.sizeBytes)
+    WHEN NOT MATCHED THEN
+        INSERT (sha256, blobPath, refCount, sizeBytes)
+        VALUES (source.sha256, source.blobPath, source.refs, source.sizeBytes)
+    OUTPUT $action, INSERTED.sha256, INSERTED.blobPath INTO @blobs;
+
+    INSERT INTO dbo.pdfTable (
+        orderID, orderNo, orderYear, countPdf, pdf, sha256
+    )
+    OUTPUT INSERTED.pdfID, INSERTED.countPdf, INSERTED.sha256 INTO @rows
+    SELECT ?, ?, ?, n.lastCount + r.rowNo, b.blobPath, r.sha256
+    FROM #pdfBatch AS r
+    JOIN @blobs AS b ON b.sha256 = r.sha256
+    CROSS JOIN (
+        SELECT ISNULL(MAX(countPdf), 0) AS lastCount
+        FROM dbo.pdfTable WITH (UPDLOCK, HOLDLOCK)
+        WHERE orderID = ?
+    ) AS n;
+
+    DROP TABLE #pdfBatch;
+
+    SELECT r.pdfID, r.countPdf, r.sha256, b.blobPath, b.mergeAction
+    FROM @rows AS r JOIN @blobs AS b ON b.sha256 = r.sha256
+    ORDER BY r.countPdf;
+    """
+
+    def insert_pdfs(self, pdf: PdfTable, uploads: List[SpooledUpload], storage: StorageBackend,
+                    executor, layout: Optional[PdfLayout] = None) -> List[PdfTable]:
+        """
+        Insert one record per upload for the order described by pdf, in
+        upload order, in one transaction. New blobs are stored concurrently
+        on executor before the INSERT batch, so no locks are held while they
+        are transferred. All or nothing: if storing fails nothing is
+        inserted, and if the batch fails the new blobs it created are deleted.
+        """
+        upload_for = {}
+        for upload in uploads:
+            upload_for.setdefault(upload.sha256, upload)
+
+        created_blobs = []  # blobs this call wrote that the MERGE inserted
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            keys = self._known_blob_paths(cursor, upload_for)
+            for sha256 in upload_for:
+                keys.setdefault(sha256, PdfTable(orderYear=pdf.orderYear, sha256=sha256).construct_path(layout))
+
+            # One blob per distinct hash; duplicate content that is present skips the transfer
+            futures = {
+                sha256: executor.submit(self._put_if_missing, storage, keys[sha256], upload)
+                for sha256, upload in upload_for.items()
+            }
+            written = set()
+            error = None
+            for sha256, future in futures.items():
+                try:
+                    if future.result():
+                        written.add(sha256)
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                # No row references them yet
+                for sha256 in written:
+                    self._delete_quietly(storage, keys[sha256])
+                raise error
+
+            self.load_temp_table(
+                cursor, '#pdfBatch',
+                "SELECT TOP 0 p.countPdf AS rowNo, p.sha256, p.pdf AS blobPath, b.sizeBytes INTO #pdfBatch "
+                "FROM dbo.pdfTable AS p CROSS JOIN dbo.pdfBlobs AS b",
+                ('rowNo', 'sha256', 'blobPath', 'sizeBytes'),
+                [(row_no, upload.sha256, keys[upload.sha256], upload.size)
+                 for row_no, upload in enumerate(uploads, start=1)],
+            )
+            cursor.execute(self.INSERT_BATCH_QUERY, (pdf.orderID, pdf.orderNo, pdf.orderYear, pdf.orderID))
+            rows = cursor.fetchall()
+            if len(rows) != len(uploads):
+                raise ValueError("Failed to retrieve pdfIDs")
+
+            blobs = {row.sha256: (row.blobPath, row.mergeAction) for row in rows}
+            for sha256, (blob_path, action) in blobs.items():
+                wrote = sha256 in written
+                if blob_path != keys[sha256] or (action == 'INSERT' and not wrote):
+                    wrote = self._settle_blob(storage, keys[sha256], blob_path, wrote, upload_for[sha256])
+                if wrote and action == 'INSERT':
+                    created_blobs.append(blob_path)
+
+            self.connection.commit()
+            for key in created_blobs:
+                self.after_rollback(lambda key=key: self._delete_quietly(storage, key))
+
+            sizes = {upload.sha256: upload.size for upload in uploads}
+            created = [
+                PdfTable(
+                    pdfID=row.pdfID,
+                    orderID=pdf.orderID,
+                    orderNo=pdf.orderNo,
+                    orderYear=pdf.orderYear,
+                    countPdf=row.countPdf,
+                    pdf=row.blobPath,
+                    sha256=row.sha256,
+                    sizeBytes=sizes[row.sha256],
+                )
+                for row in rows
+            ]
+            return created
+
+        except Exception as e:
+            # Delete blobs this call created while the MERGE's lock still
+            # keeps other uploads of the content waiting. If the batch failed
+            # before reporting its actions, new blobs are left for a sweep:
+            # another upload may already reference them.
+            for key in created_blobs:
+                self._delete_quietly(storage, key)
+            self.connection.rollback()
+            if isinstance(e, pyodbc.Error):
+                raise ValueError(f"Database error: {str(e)}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+    def delete_pdf(self, pdf_id: int, storage: StorageBackend) -> bool:
+        """Delete a record, releasing its blob; returns False if there was no such pdfID"""
         cursor = None
+        trash = None
         try:
             cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            result = cursor.fetchone()
+            cursor.execute(self.DELETE_QUERY, (pdf_id,))
+            row = cursor.fetchone()
+            if not row:
+                self.connection.rollback()
+                return False
+
+            key, sha256, orphaned = row
+            if orphaned or sha256 is None:
+                # Last reference (or a pre-dedup file only this row owned).
+                # Park the blob under a trash key before committing, so a
+                # concurrent upload of the same content recreates the blob
+                # instead of losing it to our delete.
+                trash = f"{key}.deleted"
+                try:
+                    storage.move(key, trash)
+                except FileNotFoundError:
+                    trash = None
+
             self.connection.commit()
-            
-            if not result:
-                raise ValueError("Failed to retrieve pdfID")
-            return result[0]
-            
-        except pyodbc.Error as e:
+            self.after_commit(pdf_location_cache.clear)
+            if trash:
+                parked = trash
+                self.after_rollback(lambda: storage.move(parked, key))
+                self.after_commit(lambda: self._delete_quietly(storage, parked))
+            return True
+
+        except pyodbc.Error:
             self.connection.rollback()
-            # Clean up file if DB operation failed
-            if os.path.exists(pdf.pdf):
-                os.remove(pdf.pdf)
-            raise ValueError(f"Database error: {str(e)}")
+            if trash:
+                storage.move(trash, key)
+            raise
         finally:
             if cursor:
-                cursor.close()
\ No newline at end of file
+                cursor.close()
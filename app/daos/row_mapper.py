@@ -0,0 +1,50 @@
+# app/daos/row_mapper.py
+import threading
+from operator import itemgetter
+from typing import Dict, Tuple, Type
+
+
+class RowMapper:
+    """
+    Maps pyodbc rows onto a dataclass.
+
+    Column positions are resolved once from cursor.description, so mapping a
+    row is a single itemgetter call plus the dataclass constructor instead of
+    one attribute lookup per field. Columns without a matching field are
+    ignored.
+    """
+
+    def __init__(self, model: Type, description):
+        fields = model.__dataclass_fields__
+        pairs = [(index, column[0]) for index, column in enumerate(description) if column[0] in fields]
+        if not pairs:
+            raise ValueError(f"No columns match fields of {model.__name__}")
+
+        self.model = model
+        self.names = tuple(name for _, name in pairs)
+        indexes = [index for index, _ in pairs]
+        getter = itemgetter(*indexes)
+        # itemgetter with one index returns a bare value, not a tuple
+        self._getter = getter if len(indexes) > 1 else (lambda row: (getter(row),))
+
+    def __call__(self, row):
+        return self.model(**dict(zip(self.names, self._getter(row))))
+
+    def map_all(self, rows) -> list:
+        return [self(row) for row in rows]
+
+
+_mappers: Dict[Tuple[str, Type], RowMapper] = {}
+_lock = threading.Lock()
+
+
+def mapper_for(query: str, cursor, model: Type) -> RowMapper:
+    """Return the cached mapper for (query, model), building it from the cursor on first use"""
+    key = (query, model)
+    mapper = _mappers.get(key)
+    if mapper is None:
+        with _lock:
+            mapper = _mappers.get(key)
+            if mapper is None:
+                mapper = _mappers[key] = RowMapper(model, cursor.description)
+    return mapper
@@ -1,15 +1,357 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pyodbc
+from flask import g, has_app_context
+
+from app.database.unit_of_work import UnitOfWork
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection could be checked out before the timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pyodbc connections.
+
+    Connections are created lazily up to max_size, pinged on checkout when
+    they have been idle for a while, and closed once they sit idle longer
+    than idle_timeout (never dropping below min_size).
+    """
+
+    def __init__(self, connection_string: str, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 30.0, idle_timeout: float = 300.0, ping_after: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool size must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self.connection_string = connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+
+        self._idle = deque()  # (connection, returned_at) pairs, most recent on the right
+        self._size = 0        # open connections, idle + checked out
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Counters for pool_stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        return pyodbc.connect(self.connection_string)
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+
+    def _is_healthy(self, connection, idle_for: float) -> bool:
+        """Cheap liveness check; only hits the server after ping_after seconds idle."""
+        if getattr(connection, 'closed', False):
+            return False
+        if idle_for < self.ping_after:
+            return True
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except pyodbc.Error:
+                    pass
+
+    def _evict_idle(self, now: float):
+        """Close connections idle for longer than idle_timeout. Caller holds the lock."""
+        while self._idle and self._size > self.min_size:
+            connection, returned_at = self._idle[0]
+            if now - returned_at < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._close_quietly(connection)
+
+    def checkout(self, timeout: float = None):
+        """Borrow a connection, waiting up to timeout seconds for one to free up."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    # Checked on every wake-up too: close() wakes all waiters
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    now = time.monotonic()
+                    self._evict_idle(now)
+
+                    if self._idle:
+                        connection, returned_at = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._size < self.max_size:
+                        # Reserve the slot, then connect outside the lock
+                        self._size += 1
+                        self._in_use += 1
+                        connection, returned_at = None, now
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        try:
+            if connection is None:
+                connection = self._connect()
+            elif not self._is_healthy(connection, time.monotonic() - returned_at):
+                self._close_quietly(connection)
+                with self._condition:
+                    self._discarded += 1
+                connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._condition:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return connection
+
+    def release(self, connection, discard: bool = False):
+        """Return a connection; any uncommitted work on it is rolled back."""
+        if not discard:
+            try:
+                connection.rollback()
+            except pyodbc.Error:
+                discard = True
+
+        with self._condition:
+            self._in_use -= 1
+            if self._closed:
+                discard = True
+            if discard:
+                self._size -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+        if discard:
+            self._close_quietly(connection)
+
+    def close(self):
+        """
+        Close every idle connection; checked-out ones are closed on release.
+        Threads waiting in checkout() are woken and get the "closed" error.
+        """
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.popleft()
+                self._size -= 1
+                self._close_quietly(connection)
+            self.min_size = 0
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "inUse": self._in_use,
+                "waiting": self._waiting,
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avgWaitMs": round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "maxWaitMs": round(self._max_wait * 1000, 3),
+            }
+
+
+class _StreamedBody:
+    """Iterable response body that runs on_close(success) exactly once when closed."""
+
+    def __init__(self, body, on_close):
+        self._body = iter(body)
+        self._on_close = on_close
+        self._failed = False
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._body)
+        except StopIteration:
+            raise
+        except BaseException:
+            self._failed = True
+            raise
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self._body, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close(not self._failed)
+
 
 class DatabaseConnection:
-    _instance = None
+    _pool = None
 
     @classmethod
-    def initialize(cls, connection_string):
-        if cls._instance is None:
-            cls._instance = pyodbc.connect(connection_string)
+    def initialize(cls, connection_string, min_size=1, max_size=10, timeout=30.0,
+                   idle_timeout=300.0, ping_after=30.0):
+        if cls._pool is None:
+            cls._pool = ConnectionPool(
+                connection_string,
+                min_size=min_size,
+                max_size=max_size,
+                timeout=timeout,
+                idle_timeout=idle_timeout,
+                ping_after=ping_after,
+            )
 
     @classmethod
-    def get_connection(cls):
-        if cls._instance is None:
+    def get_pool(cls) -> ConnectionPool:
+        if cls._pool is None:
             raise RuntimeError("Database not initialized!")
-        return cls._instance
\ No newline at end of file
+        return cls._pool
+
+    @classmethod
+    def get_connection(cls):
+        """
+        Return the unit of work for the current request.
+
+        The first call in a request borrows a connection from the pool and
+        wraps it in a UnitOfWork, so every DAO in the request shares one
+        connection, one cursor and one transaction. It is committed by
+        complete_request() and handed back by release_request_connection().
+        """
+        pool = cls.get_pool()
+        if not has_app_context():
+            raise RuntimeError("get_connection() needs an app context; use DatabaseConnection.unit_of_work() instead")
+        if 'unit_of_work' not in g:
+            g.unit_of_work = UnitOfWork(pool.checkout())
+        return g.unit_of_work
+
+    @classmethod
+    def complete_request(cls, response):
+        """after_request hook: commit once if the request succeeded, else roll back."""
+        uow = g.get('unit_of_work')
+        if uow is not None and not uow.completed:
+            uow.complete(success=response.status_code < 400)
+        return response
+
+    @classmethod
+    def stream_with_connection(cls, body):
+        """
+        Wrap a response body generator that reads from the request's unit of
+        work. The unit of work is detached from the request, so teardown
+        leaves it alone, and is completed and returned to the pool when the
+        WSGI server closes the body (fully sent or client gone).
+        """
+        uow = cls.get_connection()
+        g.pop('unit_of_work', None)
+        pool = cls.get_pool()
+
+        def finish(success):
+            discard = False
+            try:
+                uow.complete(success=success)
+            except pyodbc.Error:
+                discard = True
+            pool.release(uow.raw_connection, discard=discard)
+
+        return _StreamedBody(body, finish)
+
+    @classmethod
+    def release_request_connection(cls, exception=None):
+        """Teardown hook: give the request's connection back to the pool."""
+        uow = g.pop('unit_of_work', None)
+        if uow is None:
+            return
+        discard = False
+        try:
+            # Still open here when the view raised or the response is streamed
+            uow.complete(success=exception is None)
+        except pyodbc.Error:
+            discard = True
+        cls.get_pool().release(uow.raw_connection, discard=discard)
+
+    @classmethod
+    @contextmanager
+    def connection(cls):
+        """Borrow a raw connection outside of a request (scripts, background jobs)."""
+        pool = cls.get_pool()
+        conn = pool.checkout()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+
+    @classmethod
+    @contextmanager
+    def unit_of_work(cls):
+        """Run several DAO calls in one transaction outside of a request."""
+        pool = cls.get_pool()
+        uow = UnitOfWork(pool.checkout())
+        discard = False
+        try:
+            yield uow
+            uow.complete(success=True)
+        except BaseException:
+            try:
+                uow.complete(success=False)
+            except pyodbc.Error:
+                discard = True
+            raise
+        finally:
+            pool.release(uow.raw_connection, discard=discard)
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        return cls.get_pool().stats()
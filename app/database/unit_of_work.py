@@ -0,0 +1,122 @@
+import pyodbc
+
+
+class _SharedCursor:
+    """
+    Cursor handed to DAOs inside a unit of work.
+
+    DAOs keep their usual open/close pattern; close() is a no-op here and the
+    real cursor is closed once when the unit of work completes.
+    """
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        pass
+
+
+class UnitOfWork:
+    """
+    One connection, one shared cursor and one transaction for a whole request.
+
+    It quacks like a pyodbc connection, so DAOs built with it need no changes:
+    commit() only marks the work as ready and the real COMMIT happens once in
+    complete(); rollback() undoes the transaction immediately.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = None
+        self._pending = False
+        self._completed = False
+        self._after_commit = []
+        self._after_rollback = []
+        self._committed_early = False
+
+    @property
+    def raw_connection(self):
+        return self.connection
+
+    def cursor(self):
+        if self._completed:
+            raise RuntimeError("Unit of work already completed")
+        if self._cursor is None:
+            self._cursor = self.connection.cursor()
+        return _SharedCursor(self._cursor)
+
+    def after_commit(self, callback):
+        """Run callback once the transaction has actually been committed."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback):
+        """Run callback if the unit of work ends without committing (undo side effects like files)."""
+        self._after_rollback.append(callback)
+
+    def commit(self):
+        """Defer the commit to the end of the unit of work."""
+        self._pending = True
+
+    def commit_now(self):
+        """Commit immediately (chunked writes that must be durable chunk by chunk)."""
+        self.connection.commit()
+        self._pending = False
+        self._committed_early = True
+
+    def rollback(self):
+        self._pending = False
+        self.connection.rollback()
+
+    def complete(self, success: bool = True):
+        """Commit (or roll back) once and close the shared cursor."""
+        if self._completed:
+            return
+        self._completed = True
+        committed = False
+        try:
+            if success and self._pending:
+                self.connection.commit()
+                committed = True
+            else:
+                self.connection.rollback()
+        except pyodbc.Error:
+            self.connection.rollback()
+            self._run_after_rollback()
+            raise
+        finally:
+            self._pending = False
+            if self._cursor is not None:
+                try:
+                    self._cursor.close()
+                except pyodbc.Error:
+                    pass
+                self._cursor = None
+
+        callbacks, self._after_commit = self._after_commit, []
+        if committed or self._committed_early:
+            self._after_rollback = []
+            for callback in callbacks:
+                callback()
+        else:
+            self._run_after_rollback()
+
+    def _run_after_rollback(self):
+        callbacks, self._after_rollback = self._after_rollback, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"❌ after_rollback callback failed: {e}")
+
+    @property
+    def completed(self) -> bool:
+        return self._completed
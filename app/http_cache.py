@@ -0,0 +1,65 @@
+# app/http_cache.py
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, request
+
+
+def _apply_cache_control(response, max_age: int, private: bool):
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        # Cache, but revalidate with If-None-Match every time
+        response.cache_control.no_cache = True
+
+
+def conditional(version: Optional[Callable[..., Optional[object]]] = None, max_age: int = 0, private: bool = True):
+    """
+    Conditional GET support for a read endpoint.
+
+    Successful responses get a strong ETag and Cache-Control; a matching
+    If-None-Match is answered with 304 and no body. By default the ETag is a
+    hash of the response body, which saves bandwidth but still runs the view.
+    If `version` is given it is called with the view's arguments and should
+    return a cheap version token (e.g. a rowversion) or None; on a match the
+    view is not run at all.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            etag = None
+            if version is not None:
+                try:
+                    token = version(**kwargs)
+                except Exception as e:
+                    # Fall back to a body-hash ETag; the view reports real errors
+                    current_app.logger.warning(f"Version lookup failed for {request.endpoint}: {e}")
+                    token = None
+                if token is not None:
+                    etag = token.hex() if isinstance(token, (bytes, bytearray)) else str(token)
+                    etag = f"{request.endpoint}-{etag}"
+                    if request.if_none_match.contains(etag):
+                        response = current_app.response_class(status=304)
+                        response.set_etag(etag)
+                        _apply_cache_control(response, max_age, private)
+                        return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            if etag is None:
+                response.add_etag()  # SHA-1 of the body
+            else:
+                response.set_etag(etag)
+            _apply_cache_control(response, max_age, private)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -12,6 +12,7 @@ class Estimator:
     estimatorStatus : Optional[bool]= None
     coID : Optional[int]= None
     deID : Optional[int]= None
+    estimatorID : Optional[int]= None
 
     
 
@@ -1,7 +1,29 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import date
 from typing import Optional
 
+# orderStatus values with special meaning; anything else is an open order
+ORDER_STATUS_DONE = 'منجز'
+ORDER_STATUS_CANCELLED = 'الغيت'
+
+
+def _to_json_dict(instance, names, date_fields) -> dict:
+    """Shallow dict of the named fields, dates as ISO strings (no asdict deep copy)"""
+    data = {}
+    for name in names:
+        value = getattr(instance, name)
+        if value is not None and name in date_fields:
+            value = value.isoformat()
+        data[name] = value
+    return data
+
+
+def _field_names(cls):
+    """(all field names, names of the date fields) of a model dataclass"""
+    names = tuple(f.name for f in fields(cls))
+    return names, frozenset(f.name for f in fields(cls) if f.type is date or f.type == Optional[date])
+
+
 @dataclass
 class OrderTable:
     orderNo: Optional[str] = None
@@ -23,6 +45,7 @@ class OrderTable:
     color: Optional[str] = None
     checkOrderLink: Optional[bool] = None
     userID: Optional[int] = None
+    orderID: Optional[int] = None  # Set once the row exists
 
     def validate(self):
         if not self.orderNo:
@@ -33,7 +56,13 @@ class OrderTable:
             raise ValueError("Order date is required")
         if not isinstance(self.orderDate, date):
             raise ValueError("Order date must be a valid date")
-        
+
+    def to_dict(self, columns=None) -> dict:
+        """JSON-ready dict with dates as ISO strings (only `columns`, if given)"""
+        return _to_json_dict(self, columns or _ORDER_FIELDS, _ORDER_DATE_FIELDS)
+
+
+_ORDER_FIELDS, _ORDER_DATE_FIELDS = _field_names(OrderTable)
 
 
 
@@ -69,4 +98,12 @@ class OrderDetails:
     procedureName: Optional[str] = None  # From proceduresTable
     committee: Optional[str] = None      # From ComTB (ISNULL as 'no com')
     department: Optional[str] = None     # From DepTB (ISNULL as 'no dep')
-    username: Optional[str] = None       # From users table
\ No newline at end of file
+    username: Optional[str] = None       # From users table
+    orderID: Optional[int] = None
+
+    def to_dict(self, columns=None) -> dict:
+        """JSON-ready dict with dates as ISO strings (only `columns`, if given)"""
+        return _to_json_dict(self, columns or _DETAILS_FIELDS, _DETAILS_DATE_FIELDS)
+
+
+_DETAILS_FIELDS, _DETAILS_DATE_FIELDS = _field_names(OrderDetails)
@@ -1,7 +1,9 @@
 # app/models/pdf_table.py
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
-import os
+
+from app.storage.layout import PdfLayout
 
 @dataclass
 class PdfTable:
@@ -10,7 +12,10 @@ class PdfTable:
     orderNo: Optional[str] = None
     orderYear: Optional[str] = None
     countPdf: Optional[int] = None
-    pdf: Optional[str] = None  # This will store the full path
+    pdf: Optional[str] = None  # storage key, relative to the PDF storage backend
+    sha256: Optional[str] = None  # content hash, key into dbo.pdfBlobs
+    uploadedAt: Optional[datetime] = None
+    sizeBytes: Optional[int] = None  # from dbo.pdfBlobs; None for legacy rows
 
     def validate(self):
         """Validate before saving"""
@@ -23,11 +28,8 @@ class PdfTable:
         if not self.countPdf or self.countPdf < 1:
             raise ValueError("countPdf must be at least 1")
 
-    def construct_path(self, base_path: str) -> str:
-        """Generate the PDF path based on your requirements"""
-        return os.path.join(
-            base_path,
-            self.orderNo,
-            self.orderYear,
-            f"{self.countPdf}.pdf"
-        )
\ No newline at end of file
+    def construct_path(self, layout=None) -> str:
+        """Storage key of this PDF's blob (see app.storage.layout)"""
+        if not self.sha256:
+            raise ValueError("sha256 is required to place a PDF")
+        return (layout or PdfLayout()).key(self.sha256, self.orderYear)
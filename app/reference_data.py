@@ -0,0 +1,174 @@
+# app/reference_data.py
+import hashlib
+import json
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from app.models.committee import Committee
+from app.models.department import Department
+
+
+class ReferenceSnapshot(NamedTuple):
+    """One consistent, immutable load of ComTB and DepTB"""
+    committees: Mapping[int, Committee]
+    departments: Mapping[int, Department]
+    departments_by_coID: Mapping[int, Tuple[Department, ...]]
+    version: Optional[str]
+
+
+_EMPTY = ReferenceSnapshot(MappingProxyType({}), MappingProxyType({}), MappingProxyType({}), None)
+
+
+class ReferenceDataCache:
+    """
+    In-process copy of ComTB and DepTB, indexed by coID and deID.
+
+    These tables change a few times a year, so reads are served from dicts.
+    Local inserts call invalidate() (after commit); a reload every
+    reload_interval seconds picks up writes made through other nodes.
+    `version` is a hash of the loaded content, so it doubles as an ETag
+    that agrees across nodes. A failed reload keeps serving the last load
+    and is retried with backoff, so short database outages go unnoticed.
+    """
+
+    def __init__(self, reload_interval: float = 300.0, retry_interval: float = 5.0):
+        self.reload_interval = reload_interval
+        self.retry_interval = retry_interval
+        self._snapshot = _EMPTY
+        self._tree_json: Optional[Tuple[str, bytes]] = None  # (version, body)
+        self._loaded_at = 0.0
+        self._stale = True
+        self._generation = 0  # bumped by invalidate(); loads that started earlier stay stale
+        self._failures = 0  # consecutive failed reloads
+        self._retry_at = 0.0  # no reload attempt before this (monotonic) time
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> ReferenceSnapshot:
+        """The current load; read it once when several of its parts must agree"""
+        return self._snapshot
+
+    @property
+    def committees(self) -> Mapping[int, Committee]:
+        return self._snapshot.committees
+
+    @property
+    def departments(self) -> Mapping[int, Department]:
+        return self._snapshot.departments
+
+    @property
+    def departments_by_coID(self) -> Mapping[int, Tuple[Department, ...]]:
+        return self._snapshot.departments_by_coID
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._snapshot.version
+
+    def _needs_reload(self) -> bool:
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        return self._stale or now - self._loaded_at > self.reload_interval
+
+    def replace(self, committees: List[Committee], departments: List[Department],
+                generation: Optional[int] = None):
+        """
+        Swap in freshly loaded rows as one snapshot, so readers see either
+        the old or the new set, never a mix. `generation` is the value of
+        the invalidation counter when the load started; if invalidate() ran
+        since, the rows may predate that write and the cache stays stale.
+        """
+        by_coID: Dict[int, List[Department]] = {}
+        for department in departments:
+            by_coID.setdefault(department.coID, []).append(department)
+
+        digest = hashlib.sha1(json.dumps(
+            [[[c.coID, c.Com] for c in committees], [[d.deID, d.Dep, d.coID] for d in departments]],
+            ensure_ascii=False, default=str
+        ).encode('utf-8')).hexdigest()
+
+        self._snapshot = ReferenceSnapshot(
+            committees=MappingProxyType({c.coID: c for c in committees}),
+            departments=MappingProxyType({d.deID: d for d in departments}),
+            departments_by_coID=MappingProxyType({coID: tuple(deps) for coID, deps in by_coID.items()}),
+            version=digest,
+        )
+        self._loaded_at = time.monotonic()
+        self._failures = 0
+        self._retry_at = 0.0
+        if generation is None or generation == self._generation:
+            self._stale = False
+
+    def ensure_fresh(self, loader: Callable[[], Tuple[List[Committee], List[Department]]]):
+        """
+        Reload through loader() if invalidated or older than reload_interval.
+        If the reload fails the previous snapshot stays in use and the next
+        attempt waits retry_interval, doubling per failure up to
+        reload_interval. Only raises if nothing has ever been loaded.
+        """
+        if not self._needs_reload():
+            return
+        with self._lock:
+            if not self._needs_reload():
+                return
+            generation = self._generation
+            try:
+                committees, departments = loader()
+            except Exception as e:
+                if self._snapshot is _EMPTY:
+                    raise
+                self._failures += 1
+                delay = min(self.retry_interval * 2 ** (self._failures - 1), self.reload_interval)
+                self._retry_at = time.monotonic() + delay
+                print(f"❌ Reference data reload failed, serving the previous load (retry in {delay:.0f}s): {e}")
+                return
+            self.replace(committees, departments, generation=generation)
+
+    def invalidate(self):
+        """Force a reload on next access (called after committee/department writes)"""
+        self._generation += 1
+        self._stale = True
+
+    def get_committees(self) -> List[Committee]:
+        return list(self._snapshot.committees.values())
+
+    def get_departments(self, coID: int) -> List[Department]:
+        return list(self._snapshot.departments_by_coID.get(coID, ()))
+
+    def tree_json(self) -> bytes:
+        """Committees with their departments nested, serialized once per version"""
+        snapshot = self._snapshot
+        cached = self._tree_json
+        if cached is not None and cached[0] == snapshot.version:
+            return cached[1]
+        tree = [
+            {
+                "coID": committee.coID,
+                "Com": committee.Com,
+                "departments": [{"deID": d.deID, "Dep": d.Dep} for d in snapshot.departments_by_coID.get(coID, ())]
+            }
+            for coID, committee in snapshot.committees.items()
+        ]
+        body = json.dumps(tree, ensure_ascii=False, default=str).encode('utf-8')
+        self._tree_json = (snapshot.version, body)
+        return body
+
+
+def load_from_database(connection) -> Tuple[List[Committee], List[Department]]:
+    """Loader for ensure_fresh(): both tables from one joined query"""
+    # Imported here: the DAOs import this module to invalidate it
+    from app.daos.committee_dao import CommitteeDAO
+
+    return CommitteeDAO(connection).get_committees_with_departments()
+
+
+def current_reference_data() -> ReferenceDataCache:
+    """The cache, reloaded first (on the request's connection) if it is stale"""
+    from app.database.connection import DatabaseConnection
+
+    reference_data.ensure_fresh(lambda: load_from_database(DatabaseConnection.get_connection()))
+    return reference_data
+
+
+reference_data = ReferenceDataCache()
@@ -1,18 +1,19 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response
 from app.daos.committee_dao import CommitteeDAO
+from app.models.committee import Committee
 from app.database.connection import DatabaseConnection  # Import the connection
+from app.http_cache import conditional
+from app.reference_data import current_reference_data
 import pyodbc
 
 bp = Blueprint('committees', __name__, url_prefix='/api/committees')
 print(f" app file bp.... {bp}")
 @bp.route('/', methods=['GET'])
+@conditional(version=lambda **_: current_reference_data().version)
 def get_all_committees():
     try:
-        # Initialize the DAO with the database connection
-        dao = CommitteeDAO(DatabaseConnection.get_connection())  # Create an instance
-
-        # Get all committees from the database
-        committees = dao.get_all_committees()  # Call the method on the instance
+        # Served from the preloaded reference-data cache
+        committees = current_reference_data().get_committees()
 
         # Convert Committee objects to dictionaries for JSON response
         committees_data = [{"coID": committee.coID, "Com": committee.Com} for committee in committees]
@@ -23,11 +24,46 @@ def get_all_committees():
     except Exception as e:
         print(f"Unexpected error: {e}")
         return jsonify({"error": "An unexpected error occurred"}), 500
-    
 
-    
+
+
+@bp.route('/tree', methods=['GET'])
+@conditional(version=lambda **_: current_reference_data().version)
+def get_committee_tree():
+    try:
+        # Every committee with its departments nested; replaces one
+        # /api/departments/<coID> call per committee
+        return Response(current_reference_data().tree_json(), mimetype='application/json'), 200
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
 
 @bp.route('/', methods=['POST'])
 def create_committee():
-    # Your existing create_committee logic here
-    pass
\ No newline at end of file
+    data = request.json
+    try:
+        # Create a Committee object from the request data
+        committee = Committee(
+            coID=data.get('coID'),
+            Com=data.get('Com')
+        )
+
+        # Initialize the DAO with the database connection
+        dao = CommitteeDAO(DatabaseConnection.get_connection())  # Create an instance
+
+        # Insert the committee into the database
+        dao.insert_committee(committee)
+
+        return jsonify({"message": "Committee created successfully"}), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
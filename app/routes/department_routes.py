@@ -1,20 +1,20 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.daos.department_dao import DepartmentDAO
 from app.models.department import Department
 from app.database.connection import DatabaseConnection  # Import the connection
 from datetime import datetime
+from app.http_cache import conditional
+from app.reference_data import current_reference_data
 import pyodbc
 
 bp = Blueprint('departments', __name__, url_prefix='/api/departments')
 
 @bp.route('/<int:coID>', methods=['GET'])
+@conditional(version=lambda **_: current_reference_data().version)
 def get_departments_by_coID(coID: int):
     try:
-        # Initialize the DAO with the database connection
-        dao = DepartmentDAO(DatabaseConnection.get_connection())  # Create an instance
-
-        # Get departments for the specified coID
-        departments = dao.get_departments_by_coID(coID)  # Call the method on the instance
+        # Served from the preloaded reference-data cache
+        departments = current_reference_data().get_departments(coID)
 
         # Convert Department objects to dictionaries for JSON response
         departments_data = [{"deID": department.deID, "Dep": department.Dep, "coID": department.coID} for department in departments]
@@ -51,4 +51,47 @@ def create_department():
         return jsonify({"error": "Database error occurred"}), 500
     except Exception as e:
         print(f"Unexpected error: {e}")
-        return jsonify({"error": "An unexpected error occurred"}), 500
\ No newline at end of file
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@bp.route('/bulk', methods=['PUT'])
+def upsert_departments_bulk():
+    data = request.get_json(silent=True)
+    try:
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Expected a non-empty JSON array of departments"}), 400
+        max_rows = current_app.config.get('BULK_UPSERT_MAX_ROWS', 5000)
+        if len(data) > max_rows:
+            return jsonify({"error": f"Too many rows ({len(data)}); the limit is {max_rows}"}), 400
+
+        # Validate every row; only valid rows reach the MERGE
+        results = [None] * len(data)
+        valid, valid_indexes, seen_ids = [], [], {}
+        for index, item in enumerate(data):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Row must be an object")
+                department = Department(deID=item.get('deID'), Dep=item.get('Dep'), coID=item.get('coID'))
+                department.validate()
+                if department.deID in seen_ids:
+                    raise ValueError(f"Duplicate deID of row {seen_ids[department.deID] + 1}")
+                seen_ids[department.deID] = index
+            except (ValueError, TypeError) as e:
+                results[index] = {"row": index + 1, "status": "error", "error": str(e)}
+                continue
+            valid.append(department)
+            valid_indexes.append(index)
+
+        if valid:
+            dao = DepartmentDAO(DatabaseConnection.get_connection())
+            for index, action in zip(valid_indexes, dao.upsert_departments(valid)):
+                results[index] = {"row": index + 1, "status": action, "deID": data[index].get('deID')}
+
+        failed = sum(1 for result in results if result["status"] == "error")
+        return jsonify({"succeeded": len(results) - failed, "failed": failed, "results": results}), 200
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
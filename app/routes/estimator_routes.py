@@ -1,36 +1,120 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from app.daos.estimator_dao import EstimatorDAO
 from app.models.estimator import Estimator
 from app.database.connection import DatabaseConnection
 from datetime import datetime
+from app.http_cache import conditional
+from app.cache import estimator_workload_cache
+from app.models.order_table import ORDER_STATUS_DONE, ORDER_STATUS_CANCELLED
 import pyodbc
 
 bp = Blueprint('estimators', __name__, url_prefix='/api/estimators')
 
+def _estimator_from_payload(data) -> Estimator:
+    """Build an Estimator from a JSON object; raises ValueError on bad dates"""
+    # Parse dates (handle None/empty values)
+    start_date = None
+    end_date = None
+
+    if 'startDate' in data and data['startDate']:
+        try:
+            start_date = datetime.strptime(data['startDate'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError("Invalid startDate format. Use YYYY-MM-DD")
+
+    if 'endDate' in data and data['endDate']:
+        try:
+            end_date = datetime.strptime(data['endDate'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError("Invalid endDate format. Use YYYY-MM-DD")
+
+    return Estimator(
+        estimatorName=data.get('estimatorName'),
+        startDate=start_date,
+        endDate=end_date,
+        estimatorStatus=data.get('estimatorStatus'),
+        coID=data.get('coID'),
+        deID=data.get('deID'),
+        estimatorID=data.get('estimatorID')
+    )
+
+
+def _parse_bool(value):
+    if value is None or value == '':
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+
 @bp.route('/', methods=['GET'])
+@conditional()
 def get_all_estimators():
     try:
+        args = request.args
+
+        # Optional server-side filters, paging and projection
+        active_on = None
+        if args.get('activeOn'):
+            try:
+                active_on = datetime.strptime(args['activeOn'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({"error": "Invalid activeOn format. Use YYYY-MM-DD"}), 400
+
+        fields = None
+        if args.get('fields'):
+            fields = [name.strip() for name in args['fields'].split(',') if name.strip()]
+            unknown = [name for name in fields if name not in EstimatorDAO.FIELDS]
+            if unknown:
+                return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+        selected = [name for name in EstimatorDAO.FIELDS if fields is None or name in fields or name == "estimatorID"]
+
+        limit = args.get('limit', type=int)
+        if limit is not None and (limit < 1 or limit > 1000):
+            return jsonify({"error": "limit must be between 1 and 1000"}), 400
+
         # Initialize DAO with database connection
         dao = EstimatorDAO(DatabaseConnection.get_connection())
         
-        # Get all estimators
-        estimators = dao.get_all_estimators()
-        
+        estimators = dao.get_all_estimators(
+            coID=args.get('coID', type=int),
+            deID=args.get('deID', type=int),
+            estimatorStatus=_parse_bool(args.get('estimatorStatus')),
+            active_on=active_on,
+            after_id=args.get('afterID', type=int),
+            limit=limit + 1 if limit is not None else None,
+            fields=selected
+        )
+
+        # One extra row tells us whether another page exists
+        next_after_id = None
+        if limit is not None and len(estimators) > limit:
+            estimators = estimators[:limit]
+            next_after_id = estimators[-1].estimatorID
+
         # Convert to JSON-serializable format
         estimators_data = []
         for estimator in estimators:
-            estimator_dict = {
-                "estimatorName": estimator.estimatorName,
-                "startDate": estimator.startDate.isoformat() if estimator.startDate else None,
-                "endDate": estimator.endDate.isoformat() if estimator.endDate else None,
-                "estimatorStatus": estimator.estimatorStatus,
-                "coID": estimator.coID,
-                "deID": estimator.deID
-            }
+            estimator_dict = {}
+            for name in selected:
+                value = getattr(estimator, name)
+                estimator_dict[name] = value.isoformat() if name in ('startDate', 'endDate') and value else value
             estimators_data.append(estimator_dict)
         
-        return jsonify(estimators_data), 200
+        if limit is None:
+            # Unpaged: the original bare list
+            return jsonify(estimators_data), 200
+
+        # Paged, shaped like GET /api/orders: pass nextAfterID back as afterID
+        return jsonify({
+            "estimators": estimators_data,
+            "nextAfterID": next_after_id
+        }), 200
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except pyodbc.Error as e:
         print(f"Database error: {str(e)}")
         return jsonify({"error": "Database operation failed"}), 500
@@ -38,6 +122,27 @@ def get_all_estimators():
         print(f"Unexpected error: {str(e)}")
         return jsonify({"error": "An unexpected error occurred"}), 500
 
+@bp.route('/workload', methods=['GET'])
+@conditional()
+def get_estimator_workload():
+    try:
+        # Short-TTL cache: assignment screens poll this
+        workload = estimator_workload_cache.get_or_load(
+            'workload',
+            lambda: EstimatorDAO(DatabaseConnection.get_connection()).get_workload(
+                ORDER_STATUS_DONE, ORDER_STATUS_CANCELLED
+            ),
+            ttl=current_app.config.get('ESTIMATOR_WORKLOAD_TTL', 15)
+        )
+        return jsonify(workload), 200
+    except pyodbc.Error as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
 @bp.route('/', methods=['POST'])
 def create_estimator():
     try:
@@ -46,31 +151,8 @@ def create_estimator():
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        # Parse dates (handle None values)
-        start_date = None
-        end_date = None
-        
-        if 'startDate' in data and data['startDate']:
-            try:
-                start_date = datetime.strptime(data['startDate'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({"error": "Invalid startDate format. Use YYYY-MM-DD"}), 400
-                
-        if 'endDate' in data and data['endDate']:
-            try:
-                end_date = datetime.strptime(data['endDate'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({"error": "Invalid endDate format. Use YYYY-MM-DD"}), 400
-
-        # Create Estimator object
-        estimator = Estimator(
-            estimatorName=data.get('estimatorName'),
-            startDate=start_date,
-            endDate=end_date,
-            estimatorStatus=data.get('estimatorStatus'),
-            coID=data.get('coID'),
-            deID=data.get('deID')
-        )
+        # Create Estimator object (dates parsed from YYYY-MM-DD)
+        estimator = _estimator_from_payload(data)
 
         # Validate
         estimator.validate()
@@ -104,31 +186,8 @@ def update_estimator(estimator_id):
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
-        # Parse dates (handle None/empty values)
-        start_date = None
-        end_date = None
-        
-        if 'startDate' in data and data['startDate']:
-            try:
-                start_date = datetime.strptime(data['startDate'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({"error": "Invalid startDate format. Use YYYY-MM-DD"}), 400
-                
-        if 'endDate' in data and data['endDate']:
-            try:
-                end_date = datetime.strptime(data['endDate'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({"error": "Invalid endDate format. Use YYYY-MM-DD"}), 400
-
         # Create Estimator object with updated data
-        updated_estimator = Estimator(
-            estimatorName=data.get('estimatorName'),
-            startDate=start_date,
-            endDate=end_date,
-            estimatorStatus=data.get('estimatorStatus'),
-            coID=data.get('coID'),
-            deID=data.get('deID')
-        )
+        updated_estimator = _estimator_from_payload(data)
 
         # Validate
         updated_estimator.validate()
@@ -149,4 +208,54 @@ def update_estimator(estimator_id):
         return jsonify({"error": "Database operation failed"}), 500
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
-        return jsonify({"error": "An unexpected error occurred"}), 500
\ No newline at end of file
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@bp.route('/bulk', methods=['PUT'])
+def upsert_estimators_bulk():
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Expected a non-empty JSON array of estimators"}), 400
+        max_rows = current_app.config.get('BULK_UPSERT_MAX_ROWS', 5000)
+        if len(data) > max_rows:
+            return jsonify({"error": f"Too many rows ({len(data)}); the limit is {max_rows}"}), 400
+
+        # Validate every row; only valid rows reach the MERGE
+        results = [None] * len(data)
+        valid, valid_indexes, seen_ids = [], [], {}
+        for index, item in enumerate(data):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Row must be an object")
+                estimator = _estimator_from_payload(item)
+                estimator.validate()
+                if estimator.estimatorID is not None:
+                    if estimator.estimatorID in seen_ids:
+                        raise ValueError(f"Duplicate estimatorID of row {seen_ids[estimator.estimatorID] + 1}")
+                    seen_ids[estimator.estimatorID] = index
+            except (ValueError, TypeError) as e:
+                results[index] = {"row": index + 1, "status": "error", "error": str(e)}
+                continue
+            valid.append(estimator)
+            valid_indexes.append(index)
+
+        if valid:
+            dao = EstimatorDAO(DatabaseConnection.get_connection())
+            for index, outcome in zip(valid_indexes, dao.upsert_estimators(valid)):
+                if outcome["action"] == "not_found":
+                    results[index] = {"row": index + 1, "status": "error", "error": "Estimator not found"}
+                else:
+                    results[index] = {"row": index + 1, "status": outcome["action"], "estimatorID": outcome["estimatorID"]}
+
+        failed = sum(1 for result in results if result["status"] == "error")
+        return jsonify({"succeeded": len(results) - failed, "failed": failed, "results": results}), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except pyodbc.Error as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
@@ -0,0 +1,12 @@
+from flask import Blueprint, jsonify
+from app.database.connection import DatabaseConnection
+
+bp = Blueprint('health', __name__, url_prefix='/api/health')
+
+@bp.route('/db-pool', methods=['GET'])
+def db_pool_stats():
+    try:
+        # Connections in use / waiting, to size the pool against waitress's threads
+        return jsonify(DatabaseConnection.pool_stats()), 200
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
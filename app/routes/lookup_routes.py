@@ -0,0 +1,37 @@
+from flask import Blueprint, jsonify, request, current_app
+from app.daos.estimator_dao import EstimatorDAO
+from app.database.connection import DatabaseConnection
+from app.reference_data import current_reference_data
+from app.search.suggest import suggest_indexes
+import pyodbc
+
+bp = Blueprint('lookup', __name__, url_prefix='/api/lookup')
+
+@bp.route('/suggest', methods=['GET'])
+def suggest():
+    try:
+        kind = request.args.get('type')
+        query = request.args.get('q', '')
+        limit = request.args.get('limit', 10, type=int)
+
+        if kind not in suggest_indexes.TYPES:
+            return jsonify({"error": f"type must be one of {', '.join(suggest_indexes.TYPES)}"}), 400
+        if limit < 1 or limit > 50:
+            return jsonify({"error": "limit must be between 1 and 50"}), 400
+
+        # Indexes are (re)built only when their source data changed
+        if kind == 'estimator':
+            suggest_indexes.reload_interval = current_app.config.get('REFERENCE_DATA_RELOAD_SECONDS', 300)
+            suggest_indexes.ensure_estimators(
+                lambda: EstimatorDAO(DatabaseConnection.get_connection()).get_estimator_names()
+            )
+        else:
+            suggest_indexes.sync_reference_data(current_reference_data())
+
+        return jsonify(suggest_indexes.suggest(kind, query, limit=limit)), 200
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
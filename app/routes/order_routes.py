@@ -1,13 +1,61 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app, Response
 from app.daos.order_table_dao import OrderTableDAO
+from app.daos.pdf_dao import PdfDAO
 from app.models.order_table import OrderTable
 from app.database.connection import DatabaseConnection  # Import the connection
+from app.cache import order_stats_cache
+from app.search.order_index import order_search_index
+from app.http_cache import conditional
+from app.storage.backends import current_storage
+from app.storage.metadata import file_metadata_many
+from app.storage.serving import send_stored_pdf
 from datetime import datetime
+import base64
+import csv
+import io
+import json
+import tempfile
 import pyodbc
+import time
 from flask_cors import cross_origin
+from werkzeug.utils import secure_filename
 
 bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD string (or pass through None/empty)"""
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def _order_from_payload(data) -> OrderTable:
+    """Build an OrderTable from a JSON object or CSV row"""
+    # Convert date strings to date objects
+    order_date = _parse_date(data.get('orderDate'))
+    achieved_order_date = _parse_date(data.get('achievedOrderDate'))
+
+    # Create OrderTable instance
+    return OrderTable(
+        orderNo=data.get('orderNo'),
+        orderYear=data.get('orderYear'),
+        orderDate=order_date,
+        orderType=data.get('orderType'),
+        coID=data.get('coID'),
+        deID=data.get('deID'),
+        materialName=data.get('materialName'),
+        estimatorID=data.get('estimatorID'),
+        procedureID=data.get('procedureID'),   
+        
+        orderStatus=data.get('orderStatus'),
+        notes=data.get('notes'),
+        achievedOrderDate=achieved_order_date,
+        priceRequestedDestination=data.get('priceRequestedDestination'),
+        finalPrice=data.get('finalPrice'),
+        currencyType=data.get('currencyType'),
+        checkOrderLink=data.get('checkOrderLink'),
+        userID=data.get('userID')  
+    )
+
 @bp.route('', methods=['POST'],)
 
 def create_order():
@@ -19,31 +67,7 @@ def create_order():
     print("Data:", request.get_data())
 
     try:
-        # Convert date strings to date objects
-        order_date = datetime.strptime(data.get('orderDate'), '%Y-%m-%d').date() if data.get('orderDate') else None
-        achieved_order_date = datetime.strptime(data.get('achievedOrderDate'), '%Y-%m-%d').date() if data.get('achievedOrderDate') else None
-
-        # Create OrderTable instance
-        order = OrderTable(
-            orderNo=data.get('orderNo'),
-            orderYear=data.get('orderYear'),
-            orderDate=order_date,
-            orderType=data.get('orderType'),
-            coID=data.get('coID'),
-            deID=data.get('deID'),
-            materialName=data.get('materialName'),
-            estimatorID=data.get('estimatorID'),
-            procedureID=data.get('procedureID'),   
-            
-            orderStatus=data.get('orderStatus'),
-            notes=data.get('notes'),
-            achievedOrderDate=achieved_order_date,
-            priceRequestedDestination=data.get('priceRequestedDestination'),
-            finalPrice=data.get('finalPrice'),
-            currencyType=data.get('currencyType'),
-            checkOrderLink=data.get('checkOrderLink'),
-            userID=data.get('userID')  
-        )
+        order = _order_from_payload(data)
 
         # Validate the order
         order.validate()
@@ -51,10 +75,100 @@ def create_order():
         # Initialize the DAO with the database connection
         dao = OrderTableDAO(DatabaseConnection.get_connection())  # Create an instance
 
-        # Insert into the database and get the orderID
-        orderID = dao.insert_order(order)
+        # Insert into the database and get the full inserted row back
+        inserted = dao.insert_order(order)
+
+        return jsonify({
+            "message": "Order created successfully",
+            "orderID": inserted.orderID,
+            "order": inserted.to_dict()
+        }), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+# Integer columns that arrive as text in CSV imports
+_CSV_INT_FIELDS = ('coID', 'deID', 'estimatorID', 'procedureID', 'userID')
+
+
+def _csv_row_to_payload(row: dict) -> dict:
+    """Turn a CSV row (all strings) into the shape create_order receives as JSON"""
+    data = {key.strip(): (value.strip() if isinstance(value, str) else value)
+            for key, value in row.items() if key}
+    for key, value in data.items():
+        if value == '':
+            data[key] = None
+    for key in _CSV_INT_FIELDS:
+        if data.get(key) is not None:
+            data[key] = int(data[key])
+    if data.get('checkOrderLink') is not None:
+        data['checkOrderLink'] = data['checkOrderLink'].lower() in ('1', 'true', 'yes')
+    return data
+
+
+def _bulk_payload_rows():
+    """Rows of a bulk import: a JSON array, a text/csv body or a CSV file part"""
+    if 'file' in request.files:
+        text = request.files['file'].read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(text))), True
+    if request.mimetype == 'text/csv':
+        text = request.get_data().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(text))), True
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of orders or a CSV body/file")
+    return data, False
+
+
+@bp.route('/bulk', methods=['POST'])
+def create_orders_bulk():
+    try:
+        rows, is_csv = _bulk_payload_rows()
+        if not rows:
+            return jsonify({"error": "No orders provided"}), 400
+
+        max_rows = current_app.config.get('ORDER_IMPORT_MAX_ROWS', 50000)
+        if len(rows) > max_rows:
+            return jsonify({"error": f"Too many rows ({len(rows)}); the limit is {max_rows}"}), 400
 
-        return jsonify({"message": "Order created successfully", "orderID": orderID}), 201
+        # Validate every row first; only valid rows go to the database
+        results = [None] * len(rows)
+        valid_orders, valid_indexes = [], []
+        for index, row in enumerate(rows):
+            try:
+                if not isinstance(row, dict):
+                    raise ValueError("Row must be an object")
+                order = _order_from_payload(_csv_row_to_payload(row) if is_csv else row)
+                order.validate()
+            except (ValueError, TypeError) as e:
+                results[index] = {"row": index + 1, "status": "error", "error": str(e)}
+                continue
+            valid_orders.append(order)
+            valid_indexes.append(index)
+
+        dao = OrderTableDAO(DatabaseConnection.get_connection())
+        outcomes = dao.insert_orders_bulk(
+            valid_orders,
+            chunk_size=current_app.config.get('ORDER_IMPORT_CHUNK_SIZE', 500)
+        )
+
+        for index, outcome in zip(valid_indexes, outcomes):
+            if isinstance(outcome, int):
+                results[index] = {"row": index + 1, "status": "inserted", "orderID": outcome}
+            else:
+                results[index] = {"row": index + 1, "status": "error", "error": outcome}
+
+        inserted = sum(1 for result in results if result["status"] == "inserted")
+        return jsonify({
+            "inserted": inserted,
+            "failed": len(results) - inserted,
+            "results": results
+        }), 201 if inserted == len(results) else 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except pyodbc.Error as e:
@@ -64,14 +178,76 @@ def create_order():
         print(f"Unexpected error: {e}")
         return jsonify({"error": "An unexpected error occurred"}), 500
 
+def _encode_cursor(order: OrderTable) -> str:
+    """Opaque keyset cursor for the row after `order`"""
+    raw = json.dumps([order.orderYear, order.orderID]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(token: str) -> tuple:
+    try:
+        order_year, order_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return order_year, int(order_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+@bp.route('', methods=['GET'])
+@conditional()
+def list_orders():
+    try:
+        args = request.args
+        limit = args.get('limit', 50, type=int)
+        if limit < 1 or limit > 500:
+            return jsonify({"error": "limit must be between 1 and 500"}), 400
+
+        filters = {
+            "coID": args.get('coID', type=int),
+            "deID": args.get('deID', type=int),
+            "estimatorID": args.get('estimatorID', type=int),
+            "orderStatus": args.get('orderStatus'),
+            "color": args.get('color'),
+            "orderYear": args.get('orderYear'),
+            "dateFrom": _parse_date(args.get('dateFrom')),
+            "dateTo": _parse_date(args.get('dateTo')),
+        }
+        after = _decode_cursor(args['cursor']) if args.get('cursor') else None
+
+        dao = OrderTableDAO(DatabaseConnection.get_connection())
+        # Fetch one extra row to know whether another page exists
+        orders = dao.list_orders(filters, after=after, limit=limit + 1)
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+
+        columns = OrderTableDAO.LIST_COLUMNS
+        return jsonify({
+            "orders": [order.to_dict(columns) for order in orders],
+            "nextCursor": _encode_cursor(orders[-1]) if has_more else None
+        }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+def _cached_order_stats() -> dict:
+    """Grouped order statistics, recomputed at most once per ORDER_STATS_TTL"""
+    return order_stats_cache.get_or_load(
+        'orders',
+        lambda: OrderTableDAO(DatabaseConnection.get_connection()).get_order_stats(),
+        ttl=current_app.config.get('ORDER_STATS_TTL', 30)
+    )
+
+
 @bp.route('/countAllOrderNo', methods=['GET'])
+@conditional()
 def count_all_order_no():
     try:
-        # Initialize the DAO with the database connection
-        dao = OrderTableDAO(DatabaseConnection.get_connection())  # Create an instance
-
-        # Get the count of all orderNo
-        count = dao.count_all_order_no()
+        # Served from the cached statistics instead of a COUNT per request
+        count = _cached_order_stats()["countAllOrderNo"]
         return jsonify({"countAllOrderNo": count}), 200
     except pyodbc.Error as e:
         print(f"Database error details: {e}")
@@ -79,13 +255,141 @@ def count_all_order_no():
     except Exception as e:
         print(f"Unexpected error: {e}")
         return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@bp.route('/stats', methods=['GET'])
+@conditional()
+def get_order_stats():
+    try:
+        return jsonify(_cached_order_stats()), 200
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
     
 
 
 
 
+@bp.route('/search', methods=['GET'])
+def search_orders():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "Query parameter q is required"}), 400
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1 or limit > 200:
+            return jsonify({"error": "limit must be between 1 and 200"}), 400
+
+        # First search builds the index; afterwards inserts keep it current
+        order_search_index.ensure_loaded(
+            lambda: OrderTableDAO(DatabaseConnection.get_connection()).iter_search_documents()
+        )
+
+        started = time.perf_counter()
+        hits = order_search_index.search(query, limit=limit)
+        return jsonify({
+            "results": [{"orderID": order_id, "score": round(score, 4)} for order_id, score in hits],
+            "tookMs": round((time.perf_counter() - started) * 1000, 3)
+        }), 200
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+def _csv_chunks(header, rows, rows_per_chunk: int = 1000):
+    """Encode rows as UTF-8 CSV (with BOM so Excel reads Arabic), one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _xlsx_chunks(header, rows, chunk_size: int = 64 * 1024):
+    """
+    Build the workbook in openpyxl write-only mode (rows go straight to a temp
+    file) and stream the finished file; an xlsx is a zip, so it can't be sent
+    before the last row is written.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('orders')
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+@bp.route('/export', methods=['GET'])
+def export_orders():
+    try:
+        export_format = request.args.get('format', 'csv').lower()
+        order_year = request.args.get('year')
+        if export_format not in ('csv', 'xlsx'):
+            return jsonify({"error": "format must be csv or xlsx"}), 400
+        if export_format == 'xlsx':
+            try:
+                import openpyxl  # noqa: F401  (optional dependency)
+            except ImportError:
+                return jsonify({"error": "xlsx export requires openpyxl to be installed"}), 400
+
+        dao = OrderTableDAO(DatabaseConnection.get_connection())
+        header = [name for name, _ in OrderTableDAO.EXPORT_COLUMNS]
+        rows = dao.iter_orders_for_export(order_year, batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000))
+
+        filename = f"orders_{secure_filename(order_year) if order_year else 'all'}.{export_format}"
+        if export_format == 'csv':
+            body, mimetype = _csv_chunks(header, rows), 'text/csv; charset=utf-8'
+        else:
+            body, mimetype = _xlsx_chunks(header, rows), 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+        # The connection must outlive the view: rows are fetched while the body streams
+        return Response(
+            DatabaseConnection.stream_with_connection(body),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except pyodbc.Error as e:
+        print(f"Database error details: {e}")
+        return jsonify({"error": "Database error occurred"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+def _order_version(order_id):
+    """rowversion of the order plus a hash of its joined names, so unchanged details get a 304"""
+    return OrderTableDAO(DatabaseConnection.get_connection()).get_order_version(order_id)
+
+
 # app/routes/order_routes.py
 @bp.route('/<int:order_id>/details', methods=['GET'])
+@conditional(version=_order_version)
 def get_order_details(order_id):
     try:
         dao = OrderTableDAO(DatabaseConnection.get_connection())
@@ -94,40 +398,101 @@ def get_order_details(order_id):
         if not order_details:
             return jsonify({"error": "Order not found"}), 404
             
-        # Convert to dictionary (including all fields)
-        response_data = {
-            # Original fields
-         "orderNo": order_details.orderNo,
-            "orderYear": order_details.orderYear,
-            "orderDate": order_details.orderDate.isoformat() if order_details.orderDate else None,
-            "orderType": order_details.orderType,
-            "coID": order_details.coID,
-            "deID": order_details.deID,
-            "materialName": order_details.materialName,
-            "estimatorID": order_details.estimatorID,
-            "procedureID": order_details.procedureID,
-            "orderStatus": order_details.orderStatus,
-            "notes": order_details.notes,
-            "achievedOrderDate": order_details.achievedOrderDate.isoformat() if order_details.achievedOrderDate else None,
-            "priceRequestedDestination": order_details.priceRequestedDestination,
-            "finalPrice": order_details.finalPrice,
-            "currencyType": order_details.currencyType,
-            "cunnrentDate": order_details.cunnrentDate.isoformat() if order_details.cunnrentDate else None,
-            "color": order_details.color,
-            "checkOrderLink": order_details.checkOrderLink,
-            "userID": order_details.userID,
-            # Joined fields
-            "procedureName": order_details.procedureName,
-            "committee": order_details.committee,
-            "department": order_details.department,
-            "username": order_details.username
-        }
-        
-        return jsonify(response_data), 200
+        return jsonify(order_details.to_dict()), 200
         
     except pyodbc.Error as e:
         print(f"Database error: {str(e)}")
         return jsonify({"error": "Database operation failed"}), 500
     except Exception as e:
         print(f"Unexpected error: {str(e)}")
-        return jsonify({"error": "An unexpected error occurred"}), 500
\ No newline at end of file
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@bp.route('/details', methods=['GET', 'POST'])
+@conditional()
+def get_order_details_batch():
+    try:
+        # ?ids=1,2,3 or a JSON body {"ids": [1, 2, 3]}
+        if request.method == 'POST':
+            body = request.get_json(silent=True)
+            raw_ids = body.get('ids') if isinstance(body, dict) else None
+            if not isinstance(raw_ids, list):
+                return jsonify({"error": "Body must be {\"ids\": [...]}"}), 400
+        else:
+            raw_ids = [part for part in request.args.get('ids', '').split(',') if part.strip()]
+
+        try:
+            order_ids = list(dict.fromkeys(int(order_id) for order_id in raw_ids))
+        except (ValueError, TypeError):
+            return jsonify({"error": "ids must be integers"}), 400
+
+        if not order_ids:
+            return jsonify({"error": "No ids provided"}), 400
+        max_ids = current_app.config.get('ORDER_DETAILS_BATCH_MAX', 500)
+        if len(order_ids) > max_ids:
+            return jsonify({"error": f"At most {max_ids} ids per request"}), 400
+
+        dao = OrderTableDAO(DatabaseConnection.get_connection())
+        details = dao.get_order_details_many(order_ids)
+
+        return jsonify({
+            "orders": {str(order_id): item.to_dict() for order_id, item in details.items()},
+            "missing": [order_id for order_id in order_ids if order_id not in details]
+        }), 200
+
+    except pyodbc.Error as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return jsonify({"error": "An unexpected error occurred"}), 500
+
+
+@bp.route('/<int:order_id>/pdfs', methods=['GET'])
+@conditional()
+def list_order_pdfs(order_id):
+    try:
+        dao = PdfDAO(DatabaseConnection.get_connection())
+        pdfs = dao.list_pdfs(order_id)
+        stats = file_metadata_many(pdfs, current_storage())
+
+        return jsonify([
+            {
+                "pdfID": pdf.pdfID,
+                "countPdf": pdf.countPdf,
+                "size": stats[pdf.pdfID]["size"] if stats[pdf.pdfID] else None,
+                "sha256": pdf.sha256,
+                "uploadedAt": pdf.uploadedAt.isoformat() if pdf.uploadedAt else None,
+            }
+            for pdf in pdfs
+        ]), 200
+
+    except pyodbc.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/<int:order_id>/pdfs/<int:count_pdf>', methods=['GET'])
+def download_order_pdf(order_id, count_pdf):
+    try:
+        # The DAO (and a pooled connection) is only needed on a cache miss
+        response = send_stored_pdf(
+            ('order', order_id, count_pdf),
+            lambda: PdfDAO(DatabaseConnection.get_connection()).get_pdf_location_by_count(order_id, count_pdf),
+        )
+        if response is None:
+            return jsonify({"error": "PDF not found"}), 404
+        return response
+
+    except FileNotFoundError:
+        current_app.logger.error(f"PDF {count_pdf} of order {order_id} is recorded but missing on disk")
+        return jsonify({"error": "PDF file not found"}), 404
+    except pyodbc.Error as e:
+        print(f"❌ Database error: {e}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return jsonify({"error": str(e)}), 500
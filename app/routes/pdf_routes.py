@@ -2,7 +2,12 @@
 from flask import Blueprint, jsonify, request, current_app
 from app.daos.pdf_dao import PdfDAO
 from app.models.pdf_table import PdfTable
+from app.storage.backends import current_storage
+from app.storage.layout import PdfLayout
+from app.storage.serving import send_stored_pdf
+from app.storage.uploads import current_upload_executor, spool_uploads
 from app.database.connection import DatabaseConnection
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 import os
 import pyodbc
@@ -11,16 +16,25 @@ bp = Blueprint('pdfs', __name__, url_prefix='/api/pdfs')
 
 @bp.route('/upload', methods=['POST'])
 def upload_pdf():
+    """
+    Upload one or more `pdf` parts for an order. Limits: PDF_UPLOAD_MAX_FILES
+    parts, PDF_MAX_BYTES per file, and PDF_UPLOAD_MAX_TOTAL_BYTES for the
+    whole request (enforced through MAX_CONTENT_LENGTH, answered with 413).
+    """
     try:
-        # Verify the request contains files
+        # Verify the request contains files (one or more `pdf` parts)
         if 'pdf' not in request.files:
             return jsonify({"error": "No file part"}), 400
             
-        file = request.files['pdf']
+        files = request.files.getlist('pdf')
         
         # Check if file was selected
-        if file.filename == '':
+        if any(file.filename == '' for file in files):
             return jsonify({"error": "No selected file"}), 400
+
+        max_files = current_app.config['PDF_UPLOAD_MAX_FILES']
+        if len(files) > max_files:
+            return jsonify({"error": f"At most {max_files} files per upload"}), 400
             
         # Get form data
         order_id = request.form.get('orderID')
@@ -32,7 +46,7 @@ def upload_pdf():
             return jsonify({"error": "Missing required fields (orderID, orderNo, orderYear)"}), 400
             
         # Secure the filename and validate extension
-        if not file.filename.lower().endswith('.pdf'):
+        if not all(file.filename.lower().endswith('.pdf') for file in files):
             return jsonify({"error": "Only PDF files are allowed"}), 400
             
         # Create PDF object
@@ -42,19 +56,49 @@ def upload_pdf():
             orderYear=secure_filename(order_year)
         )
         
-        # Get the base path from app config
-        base_path = current_app.config['PDF_BASE_PATH']
-        
-        # Process file upload
-        dao = PdfDAO(DatabaseConnection.get_connection())
-        pdf_id = dao.insert_pdf(pdf, file.read(), base_path)
-        
+        storage = current_storage()
+        layout = PdfLayout.from_config(current_app.config)
+
+        # Stream the uploads (concurrently) to temp files in the backend's
+        # staging area, before a pooled connection is taken
+        executor = current_upload_executor()
+        uploads = spool_uploads(
+            [file.stream for file in files],
+            storage.staging_dir,
+            max_bytes=current_app.config['PDF_MAX_BYTES'],
+            executor=executor,
+            chunk_size=current_app.config['PDF_UPLOAD_CHUNK_SIZE'],
+        )
+        try:
+            # One transaction for all files
+            dao = PdfDAO(DatabaseConnection.get_connection())
+            created = dao.insert_pdfs(pdf, uploads, storage, executor, layout)
+        finally:
+            for upload in uploads:
+                upload.discard()
+
+        pdfs = [
+            {
+                "pdfID": created_pdf.pdfID,
+                "countPdf": created_pdf.countPdf,
+                "filePath": created_pdf.pdf,
+                "size": upload.size,
+                "sha256": upload.sha256
+            }
+            for created_pdf, upload in zip(created, uploads)
+        ]
+        if len(pdfs) == 1:
+            # Single-file clients read the fields at the top level
+            return jsonify({"message": "PDF uploaded successfully", **pdfs[0], "pdfs": pdfs}), 201
+
         return jsonify({
-            "message": "PDF uploaded successfully",
-            "pdfID": pdf_id,
-            "filePath": pdf.pdf
+            "message": f"{len(pdfs)} PDFs uploaded successfully",
+            "pdfs": pdfs
         }), 201
         
+    except RequestEntityTooLarge:
+        limit = current_app.config['PDF_UPLOAD_MAX_TOTAL_BYTES']
+        return jsonify({"error": f"Upload exceeds the {limit} byte total limit"}), 413
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except pyodbc.Error as e:
@@ -62,4 +106,43 @@ def upload_pdf():
         return jsonify({"error": "Database operation failed"}), 500
     except Exception as e:
         current_app.logger.error(f"Unexpected error: {str(e)}")
-        return jsonify({"error": str(e)}), 500  # More detailed error
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500  # More detailed error
+
+
+@bp.route('/<int:pdf_id>', methods=['GET'])
+def download_pdf(pdf_id):
+    try:
+        # The DAO (and a pooled connection) is only needed on a cache miss
+        response = send_stored_pdf(
+            ('pdf', pdf_id),
+            lambda: PdfDAO(DatabaseConnection.get_connection()).get_pdf_location(pdf_id),
+        )
+        if response is None:
+            return jsonify({"error": "PDF not found"}), 404
+        return response
+
+    except FileNotFoundError:
+        current_app.logger.error(f"PDF {pdf_id} is recorded but missing on disk")
+        return jsonify({"error": "PDF file not found"}), 404
+    except pyodbc.Error as e:
+        current_app.logger.error(f"Database error: {str(e)}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        current_app.logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@bp.route('/<int:pdf_id>', methods=['DELETE'])
+def delete_pdf(pdf_id):
+    try:
+        dao = PdfDAO(DatabaseConnection.get_connection())
+        if not dao.delete_pdf(pdf_id, current_storage()):
+            return jsonify({"error": "PDF not found"}), 404
+        return jsonify({"message": "PDF deleted successfully", "pdfID": pdf_id}), 200
+
+    except pyodbc.Error as e:
+        current_app.logger.error(f"Database error: {str(e)}")
+        return jsonify({"error": "Database operation failed"}), 500
+    except Exception as e:
+        current_app.logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,64 @@
+# app/search/arabic.py
+import re
+
+# Harakat, Quranic marks and superscript alef
+_DIACRITICS = re.compile('[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]')
+_TATWEEL = '\u0640'
+
+_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',  # alef variants
+    'ى': 'ي', 'ئ': 'ي',                       # alef maqsura / yaa with hamza
+    'ة': 'ه',                                  # taa marbuta
+    'ؤ': 'و',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+
+_TOKEN = re.compile(r'\w+')
+
+# Checked longest first; a stem keeps at least two letters
+_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال', 'و')
+_SUFFIXES = ('ها', 'ان', 'ات', 'ون', 'ين', 'يه', 'ه', 'ي')
+
+_STOP_WORDS = (
+    'في', 'من', 'على', 'الى', 'عن', 'مع', 'او', 'ثم', 'لا', 'ما', 'هذا', 'هذه', 'ذلك', 'التي', 'الذي',
+)
+
+
+def normalize(text: str) -> str:
+    """Strip diacritics/tatweel, fold letter variants and Arabic-Indic digits, lowercase"""
+    text = _DIACRITICS.sub('', text).replace(_TATWEEL, '')
+    return text.translate(_FOLD).lower()
+
+
+STOP_WORDS = frozenset(normalize(word) for word in _STOP_WORDS)
+
+
+def light_stem(token: str) -> str:
+    """Remove one common prefix and one common suffix (light10-style, no root extraction)"""
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            token = token[len(prefix):]
+            break
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            token = token[:-len(suffix)]
+            break
+    return token
+
+
+def words(text: str) -> list:
+    """Normalized words, unstemmed and with stop words kept (for prefix matching)"""
+    return _TOKEN.findall(normalize(text)) if text else []
+
+
+def tokenize(text: str, stem: bool = True) -> list:
+    """Normalized (and by default stemmed) search terms, stop words removed"""
+    if not text:
+        return []
+    terms = []
+    for token in _TOKEN.findall(normalize(text)):
+        if token in STOP_WORDS:
+            continue
+        terms.append(light_stem(token) if stem else token)
+    return terms
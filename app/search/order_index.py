@@ -0,0 +1,149 @@
+# app/search/order_index.py
+import heapq
+import math
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.search.arabic import tokenize
+
+# Default orderTable.notes value; carries no information, so it is not indexed
+DEFAULT_NOTES = 'لا توجد ملاحظات'
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Documents are replaced wholesale by add(), so re-adding an updated row
+    keeps postings consistent. Reads and writes share one lock; writes are
+    tiny compared to the cost of a search, so readers rarely wait. The
+    initial load is built outside that lock and swapped in at the end.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {doc_id: term frequency}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}  # doc_id -> distinct terms, for replace/remove
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # one initial load at a time
+        self._state = 'empty'  # empty -> loading -> ready
+        self._pending: List[Tuple[int, List[str]]] = []  # writes made during the load, replayed after it
+
+    @property
+    def ready(self) -> bool:
+        return self._state == 'ready'
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def _remove(self, doc_id: int):
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+
+    def _add(self, doc_id: int, terms: List[str]):
+        self._remove(doc_id)
+        if not terms:
+            return
+        counts = Counter(terms)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        self._doc_terms[doc_id] = tuple(counts)
+        self._doc_len[doc_id] = len(terms)
+        self._total_len += len(terms)
+
+    @staticmethod
+    def _terms(texts) -> List[str]:
+        return [term for text in texts if text and text != DEFAULT_NOTES for term in tokenize(text)]
+
+    def add(self, doc_id: int, *texts: str):
+        """
+        Index (or re-index) one document. Ignored until the index has started
+        loading: the initial load will pick the document up from the database.
+        During the load it is buffered and applied once the load is swapped in.
+        """
+        if self._state == 'empty':
+            return
+        terms = self._terms(texts)
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append((doc_id, terms))
+            elif self._state == 'ready':
+                self._add(doc_id, terms)
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append((doc_id, []))
+            else:
+                self._remove(doc_id)
+
+    def ensure_loaded(self, loader: Callable[[], Iterable[tuple]]):
+        """
+        Build the index once from loader(), an iterable of (doc_id, text, ...)
+        tuples. Concurrent callers wait for the first load to finish. The
+        postings are built into a separate index without holding the lock,
+        so add() calls (from order inserts) never wait for the load; they
+        are buffered and replayed after the swap.
+        """
+        if self._state == 'ready':
+            return
+        with self._load_lock:
+            if self._state == 'ready':
+                return
+            with self._lock:
+                self._pending = []
+                self._state = 'loading'
+            fresh = InvertedIndex()
+            try:
+                for doc_id, *texts in loader():
+                    fresh._add(doc_id, self._terms(texts))
+            except Exception:
+                with self._lock:
+                    self._pending = []
+                    self._state = 'empty'
+                raise
+            with self._lock:
+                self._postings = fresh._postings
+                self._doc_terms = fresh._doc_terms
+                self._doc_len = fresh._doc_len
+                self._total_len = fresh._total_len
+                # Re-adding a row the load already saw is harmless: _add replaces it
+                for doc_id, terms in self._pending:
+                    self._add(doc_id, terms)
+                self._pending = []
+                self._state = 'ready'
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """Top `limit` (doc_id, score) pairs, best first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            doc_count = len(self._doc_len)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + self.K1 * (1 - self.B + self.B * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / norm
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+# materialName + notes of every order; filled lazily on the first search
+order_search_index = InvertedIndex()
@@ -0,0 +1,166 @@
+# app/search/suggest.py
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.search.arabic import words
+
+
+def _without_article(key: str) -> Optional[str]:
+    """key without the 'ال' of its first word, or None if it has none"""
+    if key.startswith('ال') and len(key.split(' ', 1)[0]) > 3:
+        return key[2:]
+    return None
+
+
+def _keys(name: str) -> List[str]:
+    """
+    Normalized name from each word onwards, also without a leading 'ال',
+    so 'قسم الصيانة' matches 'قسم', 'الصيانه' and 'صيانه'. The first key is
+    always the full name.
+    """
+    name_words = words(name)
+    keys = []
+    for i in range(len(name_words)):
+        rest = ' '.join(name_words[i:])
+        keys.append(rest)
+        stripped = _without_article(rest)
+        if stripped:
+            keys.append(stripped)
+    return keys
+
+
+class PrefixIndex:
+    """
+    Sorted array of (normalized key, id) with bisect prefix lookups.
+
+    Every word start of a name is a key, so typing the middle word of a long
+    Arabic name still matches. Inserts use insort, which is fine for the few
+    thousand names these tables hold.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, int]] = []
+        self._items: Dict[int, dict] = {}        # id -> payload returned to clients
+        self._item_keys: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def build(self, items: Iterable[Tuple[int, str, dict]]):
+        """Replace the whole index with (id, name, payload) items"""
+        entries, payloads, item_keys = [], {}, {}
+        for item_id, name, payload in items:
+            keys = _keys(name)
+            entries.extend((key, item_id) for key in keys)
+            payloads[item_id] = payload
+            item_keys[item_id] = keys
+        entries.sort()
+        with self._lock:
+            self._entries, self._items, self._item_keys = entries, payloads, item_keys
+
+    def _remove(self, item_id: int):
+        for key in self._item_keys.pop(item_id, ()):
+            index = bisect_left(self._entries, (key, item_id))
+            if index < len(self._entries) and self._entries[index] == (key, item_id):
+                del self._entries[index]
+        self._items.pop(item_id, None)
+
+    def add(self, item_id: int, name: str, payload: dict):
+        """Insert or replace one item"""
+        keys = _keys(name)
+        with self._lock:
+            self._remove(item_id)
+            for key in keys:
+                insort(self._entries, (key, item_id))
+            self._items[item_id] = payload
+            self._item_keys[item_id] = keys
+
+    def remove(self, item_id: int):
+        with self._lock:
+            self._remove(item_id)
+
+    def suggest(self, query: str, limit: int = 10, scan_limit: int = 500) -> List[dict]:
+        """
+        Items with a word starting with query, best first: names that start
+        with the query (with or without the first word's 'ال'), then shorter names.
+        """
+        prefix = ' '.join(words(query))
+        if not prefix:
+            return []
+        with self._lock:
+            entries, items = self._entries, self._items
+            index = bisect_left(entries, (prefix,))
+            matches: Dict[int, bool] = {}  # id -> matched at the start of the name
+            while index < len(entries) and len(matches) < scan_limit:
+                key, item_id = entries[index]
+                if not key.startswith(prefix):
+                    break
+                name = self._item_keys[item_id][0]
+                at_start = key == name or key == _without_article(name)
+                matches[item_id] = matches.get(item_id, False) or at_start
+                index += 1
+            ranked = sorted(matches.items(), key=lambda m: (not m[1], len(self._item_keys[m[0]][0])))
+            return [items[item_id] for item_id, _ in ranked[:limit]]
+
+
+class SuggestIndexes:
+    """
+    One PrefixIndex per lookup type. Committees and departments are rebuilt
+    whenever the reference-data cache version changes; estimators are loaded
+    from the database and reloaded every reload_interval seconds. DAO inserts
+    add rows incrementally in between.
+    """
+
+    TYPES = ('committee', 'department', 'estimator')
+
+    def __init__(self, reload_interval: float = 300.0):
+        self.reload_interval = reload_interval
+        self.indexes = {kind: PrefixIndex() for kind in self.TYPES}
+        self._reference_version: Optional[str] = None
+        self._estimators_loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def sync_reference_data(self, reference_data):
+        """Rebuild committee/department indexes if the reference data changed"""
+        if reference_data.version == self._reference_version:
+            return
+        with self._lock:
+            snapshot = reference_data.snapshot()
+            if snapshot.version == self._reference_version:
+                return
+            self.indexes['committee'].build(
+                (c.coID, c.Com, {"coID": c.coID, "Com": c.Com})
+                for c in snapshot.committees.values()
+            )
+            self.indexes['department'].build(
+                (d.deID, d.Dep, {"deID": d.deID, "Dep": d.Dep, "coID": d.coID})
+                for d in snapshot.departments.values()
+            )
+            self._reference_version = snapshot.version
+
+    def ensure_estimators(self, loader: Callable[[], Iterable[Tuple[int, str]]]):
+        """(Re)load estimator names through loader() when missing or older than reload_interval"""
+        loaded_at = self._estimators_loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.reload_interval:
+            return
+        with self._lock:
+            loaded_at = self._estimators_loaded_at
+            if loaded_at is not None and time.monotonic() - loaded_at < self.reload_interval:
+                return
+            self.indexes['estimator'].build(
+                (estimator_id, name, {"estimatorID": estimator_id, "estimatorName": name})
+                for estimator_id, name in loader()
+            )
+            self._estimators_loaded_at = time.monotonic()
+
+    def add(self, kind: str, item_id: int, name: str, payload: dict):
+        self.indexes[kind].add(item_id, name, payload)
+
+    def suggest(self, kind: str, query: str, limit: int = 10) -> List[dict]:
+        return self.indexes[kind].suggest(query, limit=limit)
+
+
+suggest_indexes = SuggestIndexes()
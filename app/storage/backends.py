@@ -0,0 +1,297 @@
+# app/storage/backends.py
+import io
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from flask import current_app
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # only needed for PDF_STORAGE = 's3'
+    boto3 = None
+
+
+class StorageBackend:
+    """
+    Where PDF blobs are kept. Keys are backend-relative, '/'-separated
+    (e.g. '2024/f3/1c/<sha256>.pdf'); that is what pdfTable.pdf stores.
+    Methods raise FileNotFoundError for keys that do not exist.
+    """
+
+    # Directory uploads are spooled to before put_file()
+    staging_dir: str
+
+    def put_file(self, key: str, local_path: str):
+        """Store a local file under key, consuming (moving or deleting) the local file."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def stat(self, key: str) -> Tuple[int, datetime]:
+        """(size in bytes, last modified)"""
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """Streamed read of the whole blob"""
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        """Stream bytes start..end (inclusive)"""
+        raise NotImplementedError
+
+    def move(self, key: str, new_key: str):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove key; a missing key is not an error."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path for zero-copy serving, or None if the blob is remote."""
+        return None
+
+
+class LocalStorageBackend(StorageBackend):
+    """Blobs as files under root (PDF_BASE_PATH). Absolute keys (pre-key rows) are used as-is."""
+
+    def __init__(self, root: str, staging_dir: Optional[str] = None):
+        self.root = root
+        # Same filesystem as root, so put_file() is an atomic rename
+        self.staging_dir = staging_dir or os.path.join(root, '.incoming')
+
+    def local_path(self, key: str) -> str:
+        if os.path.isabs(key):
+            return key
+        return os.path.join(self.root, *key.split('/'))
+
+    def put_file(self, key: str, local_path: str):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            # Atomic rename: readers never see a half-written file
+            os.replace(local_path, path)
+        except OSError:
+            # Staging on another volume: copy beside the target, then rename
+            temp = f"{path}.part"
+            shutil.copyfile(local_path, temp)
+            os.replace(temp, path)
+            os.remove(local_path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def stat(self, key: str) -> Tuple[int, datetime]:
+        st = os.stat(self.local_path(key))
+        return st.st_size, datetime.fromtimestamp(st.st_mtime, timezone.utc)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.local_path(key), 'rb')
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        with self.open(key) as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def move(self, key: str, new_key: str):
+        new_path = self.local_path(new_key)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.replace(self.local_path(key), new_path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Blobs in an S3-compatible bucket (AWS S3, MinIO via endpoint_url).
+
+    Uploads above multipart_threshold are sent as parallel multipart
+    uploads; reads are streamed, with ranged GETs for partial downloads.
+    """
+
+    def __init__(self, bucket: str, prefix: str = '', client=None, endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None, access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                 multipart_threshold: int = 16 * 1024 * 1024, part_size: int = 8 * 1024 * 1024,
+                 max_concurrency: int = 8, staging_dir: Optional[str] = None):
+        if boto3 is None:
+            raise RuntimeError("PDF_STORAGE = 's3' needs boto3 (pip install boto3)")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = client or boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+        self.staging_dir = staging_dir or tempfile.gettempdir()
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    @staticmethod
+    def _is_missing(error) -> bool:
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def _head(self, key: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def put_file(self, key: str, local_path: str):
+        self.client.upload_file(
+            local_path, self.bucket, self._object_key(key),
+            ExtraArgs={'ContentType': 'application/pdf'},
+            Config=self.transfer_config,
+        )
+        os.remove(local_path)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._head(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stat(self, key: str) -> Tuple[int, datetime]:
+        head = self._head(key)
+        return head['ContentLength'], head['LastModified']
+
+    def _get(self, key: str, **kwargs):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key), **kwargs)['Body']
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        return self._get(key)
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        body = self._get(key, Range=f"bytes={start}-{end}")
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def move(self, key: str, new_key: str):
+        self._head(key)
+        # Managed copy: multipart server-side copy for large objects
+        self.client.copy(
+            {'Bucket': self.bucket, 'Key': self._object_key(key)},
+            self.bucket, self._object_key(new_key),
+            Config=self.transfer_config,
+        )
+        self.delete(key)
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """In-process fake for tests and stress runs; nothing touches the disk except staging."""
+
+    def __init__(self, staging_dir: Optional[str] = None):
+        self._blobs = {}  # key -> (bytes, modified)
+        self._lock = threading.Lock()
+        self.staging_dir = staging_dir or tempfile.gettempdir()
+
+    def _get(self, key: str) -> Tuple[bytes, datetime]:
+        with self._lock:
+            try:
+                return self._blobs[key]
+            except KeyError:
+                raise FileNotFoundError(key) from None
+
+    def put_file(self, key: str, local_path: str):
+        with open(local_path, 'rb') as f:
+            data = f.read()
+        with self._lock:
+            self._blobs[key] = (data, datetime.now(timezone.utc))
+        os.remove(local_path)
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self._blobs
+
+    def stat(self, key: str) -> Tuple[int, datetime]:
+        data, modified = self._get(key)
+        return len(data), modified
+
+    def open(self, key: str) -> BinaryIO:
+        return io.BytesIO(self._get(key)[0])
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        data = self._get(key)[0]
+        for offset in range(start, end + 1, chunk_size):
+            yield data[offset:min(offset + chunk_size, end + 1)]
+
+    def move(self, key: str, new_key: str):
+        with self._lock:
+            try:
+                self._blobs[new_key] = self._blobs.pop(key)
+            except KeyError:
+                raise FileNotFoundError(key) from None
+
+    def delete(self, key: str):
+        with self._lock:
+            self._blobs.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return sorted(self._blobs)
+
+
+def create_storage(config) -> StorageBackend:
+    """Build the backend selected by PDF_STORAGE ('local', 's3' or 'memory')"""
+    kind = config.get('PDF_STORAGE', 'local')
+    staging_dir = config.get('PDF_STAGING_PATH')
+    if kind == 'local':
+        return LocalStorageBackend(config['PDF_BASE_PATH'], staging_dir=staging_dir)
+    if kind == 's3':
+        return S3StorageBackend(
+            bucket=config['PDF_S3_BUCKET'],
+            prefix=config.get('PDF_S3_PREFIX', ''),
+            endpoint_url=config.get('PDF_S3_ENDPOINT_URL'),
+            region=config.get('PDF_S3_REGION'),
+            access_key=config.get('PDF_S3_ACCESS_KEY'),
+            secret_key=config.get('PDF_S3_SECRET_KEY'),
+            multipart_threshold=config.get('PDF_S3_MULTIPART_THRESHOLD', 16 * 1024 * 1024),
+            part_size=config.get('PDF_S3_PART_SIZE', 8 * 1024 * 1024),
+            max_concurrency=config.get('PDF_S3_MAX_CONCURRENCY', 8),
+            staging_dir=staging_dir,
+        )
+    if kind == 'memory':
+        return InMemoryStorageBackend(staging_dir=staging_dir)
+    raise ValueError(f"Unknown PDF_STORAGE: {kind}")
+
+
+def current_storage() -> StorageBackend:
+    """The app's PDF storage backend (set up in create_app)"""
+    return current_app.extensions['pdf_storage']
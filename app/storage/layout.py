@@ -0,0 +1,57 @@
+# app/storage/layout.py
+import os
+import re
+
+
+class PdfLayout:
+    """
+    Storage key (backend-relative path) of a blob.
+
+    flat:    {sha256}.pdf
+    sharded: {orderYear}/{sha256[0:2]}/{sha256[2:4]}/{sha256}.pdf (shard_levels=2)
+
+    The year is the orderYear of the upload that created the blob, so
+    backups and archiving can work year by year; the hash prefix keeps each
+    directory to a few hundred entries.
+    """
+
+    FLAT = 'flat'
+    SHARDED = 'sharded'
+
+    def __init__(self, scheme: str = SHARDED, shard_levels: int = 2, shard_width: int = 2):
+        if scheme not in (self.FLAT, self.SHARDED):
+            raise ValueError(f"Unknown PDF layout: {scheme}")
+        if scheme == self.SHARDED and not 1 <= shard_levels * shard_width <= 8:
+            raise ValueError("shard_levels * shard_width must be between 1 and 8")
+        self.scheme = scheme
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+
+    @classmethod
+    def from_config(cls, config) -> 'PdfLayout':
+        return cls(
+            scheme=config.get('PDF_LAYOUT', cls.SHARDED),
+            shard_levels=config.get('PDF_SHARD_LEVELS', 2),
+        )
+
+    @staticmethod
+    def _year_dir(order_year) -> str:
+        year = str(order_year or '').strip()
+        return year if re.fullmatch(r'\d{4}', year) else 'unknown'
+
+    def key(self, sha256: str, order_year=None) -> str:
+        filename = f"{sha256}.pdf"
+        if self.scheme == self.FLAT:
+            return filename
+        shards = [sha256[i * self.shard_width:(i + 1) * self.shard_width] for i in range(self.shard_levels)]
+        return '/'.join([self._year_dir(order_year), *shards, filename])
+
+    def is_laid_out(self, key: str, sha256: str) -> bool:
+        """True if key is already where this layout would put the blob (for any year)"""
+        if os.path.isabs(key) or '\\' in key:
+            return False  # absolute path from before storage keys
+        parts = key.split('/')
+        expected = self.key(sha256, '0000').split('/')
+        if self.scheme == self.FLAT:
+            return parts == expected
+        return len(parts) == len(expected) and parts[1:] == expected[1:]
@@ -0,0 +1,37 @@
+# app/storage/metadata.py
+from typing import Dict, Iterable, Optional
+
+from app.cache import pdf_metadata_cache
+from app.models.pdf_table import PdfTable
+from app.storage.backends import StorageBackend
+
+
+def _key(pdf: PdfTable) -> str:
+    return pdf.sha256 or pdf.pdf
+
+
+def _stat(pdf: PdfTable, storage: StorageBackend) -> Optional[dict]:
+    try:
+        size, modified = storage.stat(pdf.pdf)
+    except OSError:
+        return None  # missing blob: not cached, so it is retried next time
+    meta = {"size": size, "modified": modified}
+    pdf_metadata_cache.set(_key(pdf), meta)
+    return meta
+
+
+def file_metadata(pdf: PdfTable, storage: StorageBackend) -> Optional[dict]:
+    """
+    Size and modification time of a stored PDF. Uses the size recorded in
+    dbo.pdfBlobs when the row has one; legacy rows without it ask the
+    backend, cached in pdf_metadata_cache.
+    """
+    if pdf.sizeBytes is not None:
+        return {"size": pdf.sizeBytes, "modified": pdf.uploadedAt}
+    meta = pdf_metadata_cache.get(_key(pdf))
+    return meta if meta is not None else _stat(pdf, storage)
+
+
+def file_metadata_many(pdfs: Iterable[PdfTable], storage: StorageBackend) -> Dict[int, Optional[dict]]:
+    """file_metadata() per pdfID"""
+    return {pdf.pdfID: file_metadata(pdf, storage) for pdf in pdfs}
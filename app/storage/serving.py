@@ -0,0 +1,132 @@
+# app/storage/serving.py
+import os
+from typing import Callable, Hashable, Optional
+from urllib.parse import quote
+
+from flask import current_app, request, send_file
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+
+from app.cache import pdf_location_cache
+from app.models.pdf_table import PdfTable
+from app.storage.backends import LocalStorageBackend, StorageBackend, current_storage
+
+
+def _download_name(pdf: PdfTable) -> str:
+    return f"{pdf.orderNo}.{pdf.orderYear}.{pdf.countPdf}.pdf"
+
+
+def _cache_headers(response):
+    response.cache_control.public = False
+    response.cache_control.private = True
+    max_age = current_app.config.get('PDF_DOWNLOAD_MAX_AGE', 0)
+    if max_age:
+        response.cache_control.max_age = max_age
+    return response
+
+
+def _accel_redirect(pdf: PdfTable, storage: LocalStorageBackend, prefix: str):
+    """Hand the transfer to nginx (internal location `prefix` aliased to the storage root)"""
+    if os.path.isabs(pdf.pdf):
+        key = os.path.relpath(pdf.pdf, storage.root).replace(os.sep, '/')
+    else:
+        key = pdf.pdf
+    response = current_app.response_class(mimetype='application/pdf')
+    response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(key)
+    response.headers['Content-Disposition'] = f"inline; filename*=UTF-8''{quote(_download_name(pdf))}"
+    if pdf.sha256:
+        response.set_etag(pdf.sha256)
+    return response
+
+
+def _stream_from_backend(pdf: PdfTable, storage: StorageBackend):
+    """Ranged, conditional streaming for blobs that have no local path (S3, memory)"""
+    size, modified = storage.stat(pdf.pdf)
+    etag = pdf.sha256
+    response = current_app.response_class(mimetype='application/pdf')
+    if etag:
+        response.set_etag(etag)
+    response.last_modified = modified
+    response.headers['Content-Disposition'] = f"inline; filename*=UTF-8''{quote(_download_name(pdf))}"
+    response.accept_ranges = 'bytes'
+    _cache_headers(response)
+
+    if etag and request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+
+    start, stop = 0, size
+    if_range = request.if_range
+    range_applies = request.range is not None and (
+        not (if_range.etag or if_range.date) or (etag and if_range.etag == etag)
+    )
+    if range_applies:
+        window = request.range.range_for_length(size)
+        if window is None:
+            response.status_code = 416
+            response.content_range = ContentRange('bytes', None, None, size)
+            return response
+        start, stop = window
+        response.status_code = 206
+        response.content_range = ContentRange('bytes', start, stop, size)
+
+    response.response = storage.iter_range(pdf.pdf, start, stop - 1) if stop > start else iter(())
+    response.direct_passthrough = True
+    response.content_length = stop - start
+    return response
+
+
+def _send(pdf: PdfTable):
+    storage = current_storage()
+    path = storage.local_path(pdf.pdf)
+    if path is None:
+        return _stream_from_backend(pdf, storage)
+
+    prefix = current_app.config.get('PDF_X_ACCEL_REDIRECT_PREFIX')
+    if prefix and isinstance(storage, LocalStorageBackend):
+        return _accel_redirect(pdf, storage, prefix)
+
+    # conditional=True gives Range/206, If-Range, ETag and Last-Modified
+    # handling. The file goes out through the server's wsgi.file_wrapper
+    # (sendfile where available), or as an X-Sendfile header when
+    # USE_X_SENDFILE is on. Blobs are content-addressed, so the hash is a
+    # strong ETag that survives moves between directories.
+    try:
+        response = send_file(
+            path,
+            mimetype='application/pdf',
+            download_name=_download_name(pdf),
+            conditional=True,
+            etag=pdf.sha256 or True,
+            max_age=current_app.config.get('PDF_DOWNLOAD_MAX_AGE', 0),
+        )
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
+    return _cache_headers(response)
+
+
+def send_stored_pdf(cache_key: Hashable, lookup: Callable[[], Optional[PdfTable]]):
+    """
+    Serve a stored PDF, resolving its location through pdf_location_cache.
+    Returns None if there is no such record. A cached location whose blob
+    is gone (moved by a layout migration, or deleted) is looked up again once.
+    """
+    pdf = pdf_location_cache.get(cache_key)
+    cached = pdf is not None
+    if not cached:
+        pdf = lookup()
+        if pdf is None:
+            return None
+        pdf_location_cache.set(cache_key, pdf)
+
+    try:
+        return _send(pdf)
+    except FileNotFoundError:
+        if not cached:
+            raise
+        pdf_location_cache.invalidate(cache_key)
+        pdf = lookup()
+        if pdf is None:
+            return None
+        pdf_location_cache.set(cache_key, pdf)
+        return _send(pdf)
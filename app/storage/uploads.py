@@ -0,0 +1,103 @@
+# app/storage/uploads.py
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List
+
+from flask import current_app
+
+PDF_MAGIC = b'%PDF-'
+
+
+class UploadRejected(ValueError):
+    """The uploaded file is not an acceptable PDF (bad magic bytes, too large)."""
+
+
+@dataclass
+class SpooledUpload:
+    path: str     # temp file, renamed into place by the DAO
+    sha256: str
+    size: int
+
+    def discard(self):
+        """Remove the temp file if it is still there"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def spool_upload(stream, directory: str, max_bytes: int, chunk_size: int = 1024 * 1024) -> SpooledUpload:
+    """
+    Copy an upload stream to a temp file in `directory` in fixed-size chunks,
+    hashing as it goes, so memory stays at one chunk whatever the file size.
+    The temp file lives next to its final location so the later rename is
+    atomic. Raises UploadRejected for non-PDF content or files over max_bytes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', suffix='.part', delete=False)
+    try:
+        with handle:
+            head = b''
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                if len(head) < len(PDF_MAGIC):
+                    # Magic bytes must open the file; reject before spooling the rest
+                    head += chunk[:len(PDF_MAGIC) - len(head)]
+                    if not PDF_MAGIC.startswith(head):
+                        raise UploadRejected("File is not a PDF")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"File exceeds the {max_bytes} byte limit")
+                digest.update(chunk)
+                handle.write(chunk)
+            if head != PDF_MAGIC:
+                raise UploadRejected("File is not a PDF")
+            handle.flush()
+            os.fsync(handle.fileno())
+    except BaseException:
+        try:
+            os.remove(handle.name)
+        except FileNotFoundError:
+            pass
+        raise
+    return SpooledUpload(path=handle.name, sha256=digest.hexdigest(), size=size)
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file on disk, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def spool_uploads(streams, directory: str, max_bytes: int, executor, chunk_size: int = 1024 * 1024) -> List[SpooledUpload]:
+    """
+    spool_upload() several streams concurrently on executor. All or nothing:
+    if any stream is rejected or fails, the others' temp files are removed
+    and the first error is raised.
+    """
+    futures = [executor.submit(spool_upload, stream, directory, max_bytes, chunk_size) for stream in streams]
+    uploads, error = [], None
+    for future in futures:
+        try:
+            uploads.append(future.result())
+        except Exception as e:
+            error = error or e
+    if error is not None:
+        for upload in uploads:
+            upload.discard()
+        raise error
+    return uploads
+
+
+def current_upload_executor():
+    """The app's bounded thread pool for upload I/O (set up in create_app)"""
+    return current_app.extensions['pdf_upload_executor']
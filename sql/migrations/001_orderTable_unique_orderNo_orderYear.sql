@@ -0,0 +1,16 @@
+-- Enforce one order per (orderNo, orderYear) so concurrent inserts cannot
+-- create duplicates. OrderTableDAO.insert_order maps a violation to a 400.
+-- Remove existing duplicates before running this.
+USE ContractsProcedures;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'UQ_orderTable_orderNo_orderYear'
+      AND object_id = OBJECT_ID('dbo.orderTable')
+)
+BEGIN
+    CREATE UNIQUE NONCLUSTERED INDEX UQ_orderTable_orderNo_orderYear
+        ON dbo.orderTable (orderNo, orderYear);
+END
+GO
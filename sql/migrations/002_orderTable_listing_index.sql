@@ -0,0 +1,17 @@
+-- Seek index for GET /api/orders keyset pagination on (orderYear, orderID).
+-- INCLUDE covers the listing projection so pages never touch the base table.
+USE ContractsProcedures;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_orderTable_orderYear_orderID'
+      AND object_id = OBJECT_ID('dbo.orderTable')
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_orderTable_orderYear_orderID
+        ON dbo.orderTable (orderYear DESC, orderID DESC)
+        INCLUDE (orderNo, orderDate, orderType, coID, deID, materialName,
+                 estimatorID, orderStatus, color, finalPrice, currencyType);
+END
+GO
@@ -0,0 +1,10 @@
+-- Cheap change detection for conditional GETs: the ETag of
+-- /api/orders/<id>/details is the row's rowversion, read without the join.
+USE ContractsProcedures;
+GO
+
+IF COL_LENGTH('dbo.orderTable', 'rowVersion') IS NULL
+BEGIN
+    ALTER TABLE dbo.orderTable ADD rowVersion rowversion NOT NULL;
+END
+GO
@@ -0,0 +1,16 @@
+-- One countPdf per order. PdfDAO.insert_pdf allocates the count in the
+-- INSERT itself; this index backs its range lock and guards against any
+-- writer that bypasses it. Renumber existing duplicates before running this.
+USE ContractsProcedures;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'UQ_pdfTable_orderID_countPdf'
+      AND object_id = OBJECT_ID('dbo.pdfTable')
+)
+BEGIN
+    CREATE UNIQUE NONCLUSTERED INDEX UQ_pdfTable_orderID_countPdf
+        ON dbo.pdfTable (orderID, countPdf);
+END
+GO
@@ -0,0 +1,34 @@
+-- Content-addressed PDF storage: one file per distinct SHA-256, shared by
+-- every pdfTable row with that hash. refCount counts those rows; a blob is
+-- deleted when it drops to zero. Existing rows keep sha256 NULL until
+-- tools.dedup_pdfs has hashed and linked them.
+USE ContractsProcedures;
+GO
+
+IF OBJECT_ID('dbo.pdfBlobs', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.pdfBlobs (
+        sha256    CHAR(64)      NOT NULL CONSTRAINT PK_pdfBlobs PRIMARY KEY,
+        blobPath  NVARCHAR(400) NOT NULL,
+        refCount  INT           NOT NULL CONSTRAINT DF_pdfBlobs_refCount DEFAULT 0,
+        createdAt DATETIME2     NOT NULL CONSTRAINT DF_pdfBlobs_createdAt DEFAULT SYSUTCDATETIME()
+    );
+END
+GO
+
+IF COL_LENGTH('dbo.pdfTable', 'sha256') IS NULL
+BEGIN
+    ALTER TABLE dbo.pdfTable ADD sha256 CHAR(64) NULL;
+END
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_pdfTable_sha256'
+      AND object_id = OBJECT_ID('dbo.pdfTable')
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_pdfTable_sha256
+        ON dbo.pdfTable (sha256);
+END
+GO
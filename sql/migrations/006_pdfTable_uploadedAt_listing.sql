@@ -0,0 +1,27 @@
+-- Upload time for GET /api/orders/<orderID>/pdfs (NULL for rows uploaded
+-- before this migration), and make the (orderID, countPdf) index cover the
+-- listing so it is a single seek with no lookups.
+USE ContractsProcedures;
+GO
+
+IF COL_LENGTH('dbo.pdfTable', 'uploadedAt') IS NULL
+BEGIN
+    ALTER TABLE dbo.pdfTable ADD uploadedAt DATETIME2 NULL
+        CONSTRAINT DF_pdfTable_uploadedAt DEFAULT SYSUTCDATETIME();
+END
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.index_columns AS ic
+    JOIN sys.indexes AS i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+    WHERE i.name = 'UQ_pdfTable_orderID_countPdf'
+      AND i.object_id = OBJECT_ID('dbo.pdfTable')
+      AND ic.is_included_column = 1
+)
+BEGIN
+    CREATE UNIQUE NONCLUSTERED INDEX UQ_pdfTable_orderID_countPdf
+        ON dbo.pdfTable (orderID, countPdf)
+        INCLUDE (sha256, uploadedAt, pdf)
+        WITH (DROP_EXISTING = ON);
+END
+GO
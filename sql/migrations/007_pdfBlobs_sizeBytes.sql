@@ -0,0 +1,13 @@
+-- Blob size in bytes, written on upload, so GET /api/orders/<orderID>/pdfs
+-- reads it with the listing instead of asking the storage backend. NULL for
+-- blobs created before this migration: the next upload of the same content
+-- (or tools.dedup_pdfs for unlinked rows) fills it in, and until then the
+-- listing falls back to a storage stat.
+USE ContractsProcedures;
+GO
+
+IF COL_LENGTH('dbo.pdfBlobs', 'sizeBytes') IS NULL
+BEGIN
+    ALTER TABLE dbo.pdfBlobs ADD sizeBytes BIGINT NULL;
+END
+GO
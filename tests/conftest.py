@@ -0,0 +1,31 @@
+import pytest
+import pyodbc
+
+from app import create_app
+from app.database.connection import DatabaseConnection
+from app.storage.backends import InMemoryStorageBackend
+from tests.fake_sqlserver import FakeSqlServer
+
+
+@pytest.fixture
+def sql_server(monkeypatch):
+    server = FakeSqlServer()
+    monkeypatch.setattr(pyodbc, 'connect', server.connect)
+    # The pool is process-wide; give each test its own, connected to its server
+    monkeypatch.setattr(DatabaseConnection, '_pool', None)
+    return server
+
+
+@pytest.fixture
+def app(sql_server):
+    app = create_app(config_name='development')
+    app.config['TESTING'] = True
+    app.extensions['pdf_storage'] = InMemoryStorageBackend()
+    yield app
+    app.extensions['pdf_upload_executor'].shutdown()
+    DatabaseConnection.get_pool().close()
+
+
+@pytest.fixture
+def storage(app):
+    return app.extensions['pdf_storage']
@@ -0,0 +1,160 @@
+"""
+In-process stand-in for the SQL Server behind the PDF upload path.
+
+pdfTable and pdfBlobs live in dicts, #pdfBatch per connection, and writes
+are applied on commit. The UPDLOCK/HOLDLOCK range lock INSERT_BATCH_QUERY
+takes on an order's rows is modelled as a per-order lock held from the
+batch until commit or rollback; any other query returns no rows.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from app.daos.pdf_dao import PdfDAO
+
+BlobRow = namedtuple('BlobRow', 'sha256 blobPath')
+BatchRow = namedtuple('BatchRow', 'pdfID countPdf sha256 blobPath mergeAction')
+PingRow = namedtuple('PingRow', 'one')
+
+
+class FakeSqlServer:
+    def __init__(self, batch_delay: float = 0.002):
+        # Pause between reading MAX(countPdf) and writing, so an allocation
+        # that is not serialized by the lock would collide
+        self.batch_delay = batch_delay
+        self.pdfs = {}  # pdfID -> committed row dict
+        self.blobs = {}  # sha256 -> committed blob dict
+        self._next_pdf_id = 1
+        self._lock = threading.Lock()  # guards the tables
+        self._order_locks = {}
+
+    def connect(self, *args, **kwargs):
+        return FakeConnection(self)
+
+    def order_lock(self, order_id: int) -> threading.Lock:
+        with self._lock:
+            return self._order_locks.setdefault(order_id, threading.Lock())
+
+    def counts(self, order_id: int):
+        with self._lock:
+            return sorted(p['countPdf'] for p in self.pdfs.values() if p['orderID'] == order_id)
+
+    def allocate_pdf_ids(self, n: int) -> range:
+        with self._lock:
+            ids = range(self._next_pdf_id, self._next_pdf_id + n)
+            self._next_pdf_id += n
+            return ids
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.fast_executemany = False
+        self._rows = []
+
+    def execute(self, query, *params):
+        if len(params) == 1 and isinstance(params[0], (tuple, list)):
+            params = tuple(params[0])
+        self._rows = self.connection.run(query, params)
+        return self
+
+    def executemany(self, query, seq):
+        self.connection.run_many(query, list(seq))
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, server: FakeSqlServer):
+        self.server = server
+        self._batch = []
+        self._pending = []
+        self._held = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def run(self, query, params):
+        if query.strip() == "SELECT 1":
+            return [PingRow(1)]
+        if "FROM dbo.pdfBlobs WHERE sha256 IN" in query:
+            with self.server._lock:
+                return [BlobRow(sha, self.server.blobs[sha]['blobPath']) for sha in params if sha in self.server.blobs]
+        if "tempdb..#pdfBatch" in query:
+            self._batch = []
+            return []
+        if query == PdfDAO.INSERT_BATCH_QUERY:
+            return self._insert_batch(*params)
+        return []
+
+    def run_many(self, query, rows):
+        if "INSERT INTO #pdfBatch" in query:
+            self._batch.extend(rows)
+
+    def _insert_batch(self, order_id, order_no, order_year, _order_id):
+        lock = self.server.order_lock(order_id)
+        lock.acquire()
+        self._held.append(lock)
+
+        server = self.server
+        with server._lock:
+            last_count = max((p['countPdf'] for p in server.pdfs.values() if p['orderID'] == order_id), default=0)
+            known = {sha: dict(blob) for sha, blob in server.blobs.items()}
+        time.sleep(server.batch_delay)
+
+        blobs = {}
+        for _, sha256, blob_path, size in sorted(self._batch):
+            if sha256 in known:
+                blobs.setdefault(sha256, ('UPDATE', known[sha256]['blobPath'], size))
+            else:
+                blobs.setdefault(sha256, ('INSERT', blob_path, size))
+
+        pdf_ids = server.allocate_pdf_ids(len(self._batch))
+        rows = [
+            BatchRow(pdf_id, last_count + row_no, sha256, blobs[sha256][1], blobs[sha256][0])
+            for pdf_id, (row_no, sha256, _, _) in zip(pdf_ids, sorted(self._batch))
+        ]
+
+        def apply():
+            for sha256, (_, blob_path, size) in blobs.items():
+                blob = server.blobs.setdefault(sha256, {'blobPath': blob_path, 'refCount': 0, 'sizeBytes': size})
+                blob['refCount'] += sum(1 for row in rows if row.sha256 == sha256)
+            for row in rows:
+                server.pdfs[row.pdfID] = {
+                    'orderID': order_id, 'orderNo': order_no, 'orderYear': order_year,
+                    'countPdf': row.countPdf, 'pdf': row.blobPath, 'sha256': row.sha256,
+                }
+
+        self._pending.append(apply)
+        self._batch = []
+        return sorted(rows, key=lambda row: row.countPdf)
+
+    def _end(self, apply: bool):
+        if apply:
+            with self.server._lock:
+                for change in self._pending:
+                    change()
+        self._pending = []
+        held, self._held = self._held, []
+        for lock in held:
+            lock.release()
+
+    def commit(self):
+        self._end(apply=True)
+
+    def rollback(self):
+        self._end(apply=False)
+
+    def close(self):
+        self.rollback()
+        self.closed = True
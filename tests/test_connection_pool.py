@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from app.database.connection import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(sql_server):
+    return ConnectionPool('fake', min_size=0, max_size=1, timeout=10)
+
+
+def test_close_wakes_waiting_checkouts_with_a_closed_error(pool):
+    held = pool.checkout()
+    errors = []
+
+    def wait_for_connection():
+        try:
+            pool.checkout()
+        except Exception as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait_for_connection)
+    waiter.start()
+    while pool.stats()["waiting"] == 0:
+        time.sleep(0.001)
+
+    started = time.monotonic()
+    pool.close()
+    waiter.join(5)
+
+    assert not waiter.is_alive()
+    assert time.monotonic() - started < 1
+    assert len(errors) == 1
+    assert isinstance(errors[0], RuntimeError) and not isinstance(errors[0], PoolTimeoutError)
+    assert "closed" in str(errors[0])
+
+    pool.release(held)
+    assert held.closed
+
+
+def test_checkout_after_close_raises(pool):
+    pool.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.checkout()
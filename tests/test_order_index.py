@@ -0,0 +1,48 @@
+import threading
+
+from app.search.order_index import InvertedIndex
+
+
+def test_add_during_the_initial_load_does_not_wait_and_is_kept():
+    index = InvertedIndex()
+    streaming = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        yield 1, 'مضخة مياه', None
+        streaming.set()
+        release.wait(5)  # the rest of a slow table scan
+        yield 2, 'مولدة كهرباء', None
+
+    load = threading.Thread(target=index.ensure_loaded, args=(loader,))
+    load.start()
+    assert streaming.wait(5)
+
+    adder = threading.Thread(target=index.add, args=(3, 'مضخة حريق', None))
+    adder.start()
+    adder.join(1)
+    assert not adder.is_alive(), "add() blocked on the initial load"
+    assert not index.ready
+
+    release.set()
+    load.join(5)
+    assert index.ready
+    assert {doc_id for doc_id, _ in index.search('مضخة')} == {1, 3}
+    assert [doc_id for doc_id, _ in index.search('كهرباء')] == [2]
+
+
+def test_failed_load_leaves_the_index_empty_and_retryable():
+    index = InvertedIndex()
+
+    def failing():
+        yield 1, 'مضخة', None
+        raise RuntimeError('connection lost')
+
+    try:
+        index.ensure_loaded(failing)
+    except RuntimeError:
+        pass
+    assert not index.ready and len(index) == 0
+
+    index.ensure_loaded(lambda: [(1, 'مضخة', None)])
+    assert [doc_id for doc_id, _ in index.search('مضخة')] == [1]
@@ -0,0 +1,113 @@
+import hashlib
+import os
+
+import pytest
+
+from app.cache import pdf_location_cache
+from app.models.pdf_table import PdfTable
+from app.storage.backends import InMemoryStorageBackend, LocalStorageBackend
+from app.storage.serving import send_stored_pdf
+
+BODY = b'%PDF-1.4\n' + b'0123456789' * 100 + b'\n%%EOF\n'
+SHA256 = hashlib.sha256(BODY).hexdigest()
+KEY = f'2024/{SHA256[:2]}/{SHA256[2:4]}/{SHA256}.pdf'
+
+
+@pytest.fixture(params=['memory', 'local'])
+def stored(request, app, tmp_path):
+    """The app's storage backend holding BODY under KEY"""
+    if request.param == 'memory':
+        storage = InMemoryStorageBackend(staging_dir=str(tmp_path))
+    else:
+        storage = LocalStorageBackend(str(tmp_path / 'root'), staging_dir=str(tmp_path))
+    app.extensions['pdf_storage'] = storage
+    path = tmp_path / 'upload.tmp'
+    path.write_bytes(BODY)
+    storage.put_file(KEY, str(path))
+    pdf_location_cache.clear()
+    yield storage
+    pdf_location_cache.clear()
+
+
+def _pdf(key: str = KEY) -> PdfTable:
+    return PdfTable(pdfID=1, orderID=7, orderNo='45', orderYear='2024', countPdf=3, pdf=key, sha256=SHA256)
+
+
+def _get(app, headers=None):
+    """GET /api/pdfs/1 with its location already cached (no database lookup)"""
+    pdf_location_cache.set(('pdf', 1), _pdf())
+    with app.test_client() as client:
+        return client.get('/api/pdfs/1', headers=headers or {})
+
+
+def _send(app, lookup):
+    with app.test_request_context('/api/pdfs/1'):
+        response = send_stored_pdf(('pdf', 1), lookup)
+        if response is not None:
+            response.direct_passthrough = False
+            response.make_sequence()
+        return response
+
+
+def test_full_download(app, stored):
+    response = _get(app)
+
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+    assert response.headers['ETag'] == f'"{SHA256}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['Content-Type'] == 'application/pdf'
+    assert 'private' in response.headers['Cache-Control']
+    assert 'public' not in response.headers['Cache-Control']
+
+
+def test_range_request_returns_partial_content(app, stored):
+    response = _get(app, {'Range': 'bytes=9-18'})
+
+    assert response.status_code == 206
+    assert response.get_data() == BODY[9:19]
+    assert response.headers['Content-Range'] == f'bytes 9-18/{len(BODY)}'
+    assert int(response.headers['Content-Length']) == 10
+
+
+def test_suffix_range_returns_the_tail(app, stored):
+    response = _get(app, {'Range': 'bytes=-7'})
+
+    assert response.status_code == 206
+    assert response.get_data() == BODY[-7:]
+
+
+def test_if_none_match_returns_304(app, stored):
+    response = _get(app, {'If-None-Match': f'"{SHA256}"'})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+
+def test_unsatisfiable_range_returns_416(app, stored):
+    response = _get(app, {'Range': f'bytes={len(BODY) + 10}-'})
+
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(BODY)}'
+
+
+def test_if_range_with_another_etag_sends_the_whole_file(app, stored):
+    response = _get(app, {'Range': 'bytes=0-9', 'If-Range': '"someone-else"'})
+
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+
+
+def test_unknown_pdf_returns_none(app, stored):
+    assert _send(app, lambda: None) is None
+
+
+def test_cached_location_of_a_moved_blob_is_looked_up_again(app, stored):
+    stored.move(KEY, 'moved.pdf')
+    pdf_location_cache.set(('pdf', 1), _pdf(KEY))
+
+    response = _send(app, lambda: _pdf('moved.pdf'))
+
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+    assert pdf_location_cache.get(('pdf', 1)).pdf == 'moved.pdf'
@@ -0,0 +1,48 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+ORDER_ID = 123
+
+
+def _pdf(n: int) -> tuple:
+    body = b'%PDF-1.4\n% upload ' + str(n).encode() + b'\n%%EOF\n'
+    return io.BytesIO(body), f'upload-{n}.pdf'
+
+
+def _upload(app, parts):
+    with app.test_client() as client:
+        return client.post('/api/pdfs/upload', data={
+            'orderID': str(ORDER_ID),
+            'orderNo': '45',
+            'orderYear': '2024',
+            'pdf': parts,
+        })
+
+
+def test_parallel_uploads_get_unique_contiguous_counts(app, sql_server, storage):
+    uploads = 50
+    with ThreadPoolExecutor(max_workers=uploads) as executor:
+        responses = list(executor.map(lambda n: _upload(app, _pdf(n)), range(uploads)))
+
+    assert [response.status_code for response in responses] == [201] * uploads
+    bodies = [response.get_json() for response in responses]
+    counts = sorted(body['countPdf'] for body in bodies)
+    assert counts == list(range(1, uploads + 1))
+    assert sql_server.counts(ORDER_ID) == counts
+    assert all(storage.exists(body['filePath']) for body in bodies)
+
+
+def test_parallel_multi_file_uploads_get_contiguous_ranges(app, sql_server):
+    requests, files = 10, 5
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        responses = list(executor.map(
+            lambda r: _upload(app, [_pdf(r * files + i) for i in range(files)]), range(requests)
+        ))
+
+    assert [response.status_code for response in responses] == [201] * requests
+    ranges = [[pdf['countPdf'] for pdf in response.get_json()['pdfs']] for response in responses]
+    for counts in ranges:
+        # One request's files are numbered in upload order, without gaps
+        assert counts == list(range(counts[0], counts[0] + files))
+    assert sorted(count for counts in ranges for count in counts) == list(range(1, requests * files + 1))
+    assert sql_server.counts(ORDER_ID) == list(range(1, requests * files + 1))
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from app.storage.backends import InMemoryStorageBackend, LocalStorageBackend
+
+BODY = b'%PDF-1.4\n' + bytes(range(256)) * 4 + b'\n%%EOF\n'
+
+
+@pytest.fixture(params=['memory', 'local'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return InMemoryStorageBackend(staging_dir=str(tmp_path / 'staging'))
+    return LocalStorageBackend(str(tmp_path / 'root'), staging_dir=str(tmp_path / 'staging'))
+
+
+def _staged(backend, body: bytes = BODY) -> str:
+    staging = backend.staging_dir
+    os.makedirs(staging, exist_ok=True)
+    path = os.path.join(staging, f'upload-{len(os.listdir(staging))}.tmp')
+    with open(path, 'wb') as f:
+        f.write(body)
+    return path
+
+
+def test_put_file_stores_and_consumes_the_local_file(backend):
+    path = _staged(backend)
+    backend.put_file('2024/ab/cd/blob.pdf', path)
+
+    assert not os.path.exists(path)
+    assert backend.exists('2024/ab/cd/blob.pdf')
+    with backend.open('2024/ab/cd/blob.pdf') as f:
+        assert f.read() == BODY
+
+
+def test_exists_is_false_for_unknown_keys(backend):
+    assert not backend.exists('nope.pdf')
+
+
+def test_stat_reports_size_and_modified_time(backend):
+    backend.put_file('a.pdf', _staged(backend))
+    size, modified = backend.stat('a.pdf')
+
+    assert size == len(BODY)
+    assert isinstance(modified, datetime) and modified.tzinfo is not None
+
+
+@pytest.mark.parametrize('start, end', [(0, len(BODY) - 1), (0, 0), (10, 99), (len(BODY) - 5, len(BODY) - 1)])
+def test_iter_range_is_inclusive(backend, start, end):
+    backend.put_file('a.pdf', _staged(backend))
+    assert b''.join(backend.iter_range('a.pdf', start, end, chunk_size=64)) == BODY[start:end + 1]
+
+
+def test_move_renames_the_blob(backend):
+    backend.put_file('a.pdf', _staged(backend))
+    backend.move('a.pdf', 'b/c.pdf')
+
+    assert not backend.exists('a.pdf')
+    assert backend.stat('b/c.pdf')[0] == len(BODY)
+
+
+def test_delete_removes_and_ignores_missing_keys(backend):
+    backend.put_file('a.pdf', _staged(backend))
+    backend.delete('a.pdf')
+    backend.delete('a.pdf')
+
+    assert not backend.exists('a.pdf')
+
+
+@pytest.mark.parametrize('call', [
+    lambda b: b.stat('missing.pdf'),
+    lambda b: b.open('missing.pdf'),
+    lambda b: b''.join(b.iter_range('missing.pdf', 0, 10)),
+    lambda b: b.move('missing.pdf', 'other.pdf'),
+])
+def test_missing_keys_raise_file_not_found(backend, call):
+    with pytest.raises(FileNotFoundError):
+        call(backend)
@@ -0,0 +1,37 @@
+from app.search.suggest import PrefixIndex
+
+
+def _index(*names):
+    index = PrefixIndex()
+    index.build((item_id, name, {"id": item_id, "name": name}) for item_id, name in enumerate(names, start=1))
+    return index
+
+
+def _suggest(index, query):
+    return [item["name"] for item in index.suggest(query)]
+
+
+def test_name_starting_with_the_word_ranks_first_without_its_article():
+    index = _index('قسم الصيانة', 'الصيانة العامة')
+
+    assert _suggest(index, 'صيان') == ['الصيانة العامة', 'قسم الصيانة']
+    assert _suggest(index, 'الصيان') == ['الصيانة العامة', 'قسم الصيانة']
+
+
+def test_start_matches_rank_before_shorter_mid_name_matches():
+    index = _index('قسم المشتريات', 'المشتريات والعقود الحكومية')
+
+    assert _suggest(index, 'مشتر') == ['المشتريات والعقود الحكومية', 'قسم المشتريات']
+
+
+def test_shorter_names_win_among_start_matches():
+    index = _index('لجنة الفحص والاستلام', 'لجنة الفحص')
+
+    assert _suggest(index, 'لجنه') == ['لجنة الفحص', 'لجنة الفحص والاستلام']
+
+
+def test_typing_a_middle_word_matches():
+    index = _index('لجنة الفحص والاستلام', 'قسم الصيانة')
+
+    assert _suggest(index, 'الفحص') == ['لجنة الفحص والاستلام']
+    assert _suggest(index, 'فحص') == ['لجنة الفحص والاستلام']
@@ -0,0 +1,82 @@
+"""
+Compare single-order inserts with the bulk import path.
+
+    python -m tools.bench_order_import --rows 2000 --config development
+
+Rows are written under a throwaway orderYear and deleted afterwards.
+"""
+import argparse
+import time
+from datetime import date
+
+from app import create_app
+from app.daos.order_table_dao import OrderTableDAO
+from app.database.connection import DatabaseConnection
+from app.models.order_table import OrderTable
+
+
+def make_orders(prefix: str, count: int, year: str):
+    return [
+        OrderTable(
+            orderNo=f"{prefix}{i:06d}",
+            orderYear=year,
+            orderDate=date.today(),
+            orderType='bench',
+            materialName='bench',
+            orderStatus='قيد الانجاز',
+        )
+        for i in range(count)
+    ]
+
+
+def cleanup(year: str):
+    with DatabaseConnection.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM [dbo].[orderTable] WHERE orderYear = ? AND orderType = 'bench'", (year,))
+        conn.commit()
+        cursor.close()
+
+
+def bench_single(orders):
+    started = time.perf_counter()
+    for order in orders:
+        # One request = one unit of work = one commit
+        with DatabaseConnection.unit_of_work() as uow:
+            OrderTableDAO(uow).insert_order(order)
+    return time.perf_counter() - started
+
+
+def bench_bulk(orders, chunk_size: int):
+    started = time.perf_counter()
+    with DatabaseConnection.unit_of_work() as uow:
+        results = OrderTableDAO(uow).insert_orders_bulk(orders, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if not isinstance(r, int)]
+    if failed:
+        print(f"  {len(failed)} bulk rows failed, first error: {failed[0]}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--year', default='1900', help="orderYear used for the throwaway rows")
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    create_app(config_name=args.config)
+    cleanup(args.year)
+    try:
+        single = bench_single(make_orders('S', args.rows, args.year))
+        bulk = bench_bulk(make_orders('B', args.rows, args.year), args.chunk_size)
+    finally:
+        cleanup(args.year)
+
+    print(f"single inserts: {args.rows} rows in {single:.2f}s ({args.rows / single:,.0f} rows/s)")
+    print(f"bulk import:    {args.rows} rows in {bulk:.2f}s ({args.rows / bulk:,.0f} rows/s)")
+    print(f"speed-up:       {single / bulk:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Move existing PDFs into content-addressed storage.
+
+    python -m tools.dedup_pdfs --workers 8 --batch-size 500 [--dry-run]
+
+Hashes every pdfTable row that has no sha256 yet (in parallel), stores one
+blob per distinct hash, points the rows at it, takes the references in
+dbo.pdfBlobs and deletes the now redundant copies. Batches are committed
+one at a time and only unprocessed rows are picked up, so an interrupted
+run can simply be restarted.
+"""
+import argparse
+import os
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.daos.base_dao import BaseDAO
+from app.database.connection import DatabaseConnection
+from app.storage.backends import LocalStorageBackend
+from app.storage.layout import PdfLayout
+from app.storage.uploads import file_sha256
+
+
+def load_batch(cursor, after_id: int, batch_size: int):
+    cursor.execute("""
+        SELECT TOP (?) pdfID, pdf, orderYear
+        FROM dbo.pdfTable
+        WHERE sha256 IS NULL AND pdfID > ?
+        ORDER BY pdfID
+    """, (batch_size, after_id))
+    return cursor.fetchall()
+
+
+def hash_row(row):
+    pdf_id, path, order_year = row
+    try:
+        return pdf_id, path, order_year, file_sha256(path), os.path.getsize(path)
+    except OSError:
+        return pdf_id, path, order_year, None, 0
+
+
+def existing_blobs(cursor, hashes):
+    if not hashes:
+        return {}
+    placeholders = ", ".join("?" * len(hashes))
+    cursor.execute(f"SELECT sha256, blobPath FROM dbo.pdfBlobs WHERE sha256 IN ({placeholders})", list(hashes))
+    return {sha: path for sha, path in cursor.fetchall()}
+
+
+def still_referenced(cursor, paths, chunk_size: int = 2000):
+    """The subset of paths some pdfTable row still points at (e.g. a row in a later batch)"""
+    paths = list(paths)
+    referenced = set()
+    for start in range(0, len(paths), chunk_size):
+        chunk = paths[start:start + chunk_size]
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT DISTINCT pdf FROM dbo.pdfTable WHERE pdf IN ({placeholders})", chunk)
+        referenced.update(path for path, in cursor.fetchall())
+    return referenced
+
+
+def place_blob(source: str, blob: str) -> int:
+    """
+    Hard-link (or copy) source to blob. Returns the bytes the new blob
+    keeps allocated once the originals are deleted (0 if it already existed).
+    """
+    if os.path.exists(blob):
+        return 0
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    temp = f"{blob}.part"
+    try:
+        os.link(source, temp)
+    except OSError:
+        shutil.copy2(source, temp)
+    os.replace(temp, blob)
+    return os.path.getsize(blob)
+
+
+def same_file_path(a: str, b: str) -> bool:
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def remove_file(path: str) -> int:
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except OSError:
+        return 0
+
+
+def link_rows(conn, rows):
+    """Point rows at their blobs and take the references, in one transaction"""
+    cursor = conn.cursor()
+    try:
+        BaseDAO.load_temp_table(
+            cursor, '#dedupRows',
+            "SELECT TOP 0 p.pdfID, p.sha256, p.pdf AS blobPath, b.sizeBytes INTO #dedupRows "
+            "FROM dbo.pdfTable AS p CROSS JOIN dbo.pdfBlobs AS b",
+            ('pdfID', 'sha256', 'blobPath', 'sizeBytes'), rows,
+        )
+        cursor.execute("""
+        MERGE dbo.pdfBlobs WITH (HOLDLOCK) AS target
+        USING (
+            SELECT sha256, MIN(blobPath) AS blobPath, MIN(sizeBytes) AS sizeBytes, COUNT(*) AS refs
+            FROM #dedupRows GROUP BY sha256
+        ) AS source
+            ON target.sha256 = source.sha256
+        WHEN MATCHED THEN
+            UPDATE SET refCount = target.refCount + source.refs,
+                       sizeBytes = ISNULL(target.sizeBytes, source.sizeBytes)
+        WHEN NOT MATCHED THEN
+            INSERT (sha256, blobPath, refCount, sizeBytes)
+            VALUES (source.sha256, source.blobPath, source.refs, source.sizeBytes);
+
+        UPDATE p SET pdf = r.blobPath, sha256 = r.sha256
+        FROM dbo.pdfTable AS p
+        JOIN #dedupRows AS r ON r.pdfID = p.pdfID
+        WHERE p.sha256 IS NULL;
+
+        DROP TABLE #dedupRows;
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8, help="parallel hashing/deleting threads")
+    parser.add_argument('--batch-size', type=int, default=500, help="rows per transaction")
+    parser.add_argument('--dry-run', action='store_true', help="only report what would be reclaimed")
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    app = create_app(config_name=args.config)
+    storage = app.extensions['pdf_storage']
+    if not isinstance(storage, LocalStorageBackend):
+        parser.error("dedup_pdfs works on the local PDF_BASE_PATH tree (PDF_STORAGE = 'local')")
+    layout = PdfLayout.from_config(app.config)
+
+    started = time.perf_counter()
+    scanned = missing = linked = 0
+    written = removed = 0
+    seen = {}  # sha256 -> size, for the dry-run estimate
+    duplicate_bytes = 0
+    after_id = 0
+    deferred = set()  # redundant copies a not-yet-linked row still points at
+
+    with DatabaseConnection.connection() as conn, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        while True:
+            cursor = conn.cursor()
+            rows = load_batch(cursor, after_id, args.batch_size)
+            if not rows:
+                cursor.close()
+                break
+            after_id = rows[-1][0]
+
+            hashed = list(executor.map(hash_row, rows))
+            scanned += len(hashed)
+            present = [h for h in hashed if h[3] is not None]
+            missing += len(hashed) - len(present)
+            for pdf_id, path, _, sha, size in hashed:
+                if sha is None:
+                    print(f"❌ pdfID {pdf_id}: file missing, skipped ({path})")
+
+            if args.dry_run:
+                for _, _, _, sha, size in present:
+                    if sha in seen:
+                        duplicate_bytes += size
+                    seen[sha] = size
+                cursor.close()
+                continue
+
+            by_hash = defaultdict(list)
+            sizes = {}
+            for pdf_id, path, order_year, sha, size in present:
+                by_hash[sha].append((pdf_id, path, order_year))
+                sizes[sha] = size
+            blobs = existing_blobs(cursor, by_hash.keys())
+            cursor.close()
+            for sha, members in by_hash.items():
+                blobs.setdefault(sha, layout.key(sha, members[0][2]))
+
+            # Blobs must be on disk before any row points at them
+            written += sum(executor.map(
+                lambda sha: place_blob(by_hash[sha][0][1], storage.local_path(blobs[sha])), by_hash
+            ))
+
+            link_rows(conn, [(pdf_id, sha, blobs[sha], sizes[sha])
+                             for sha, members in by_hash.items() for pdf_id, _, _ in members])
+            linked += len(present)
+
+            # Committed: the original per-order copies are now redundant, unless
+            # a row in a later batch still points at the same file. Those are
+            # kept and retried after each batch until that row is linked too.
+            redundant = {path for sha, members in by_hash.items() for _, path, _ in members
+                         if not same_file_path(path, storage.local_path(blobs[sha]))}
+            candidates = redundant | deferred
+            cursor = conn.cursor()
+            deferred = still_referenced(cursor, candidates)
+            cursor.close()
+            removed += sum(executor.map(remove_file, candidates - deferred))
+            print(f"✅ linked {linked} rows so far (last pdfID {after_id})")
+
+    elapsed = time.perf_counter() - started
+    mb = 1024 * 1024
+    print(f"scanned {scanned} rows in {elapsed:.1f}s, {missing} missing files")
+    if args.dry_run:
+        print(f"{len(seen)} distinct files; deduplication would reclaim {duplicate_bytes / mb:,.1f} MB")
+    else:
+        print(f"linked {linked} rows; reclaimed {(removed - written) / mb:,.1f} MB")
+        if deferred:
+            print(f"❌ {len(deferred)} copies kept: still referenced by rows that could not be linked")
+
+
+if __name__ == '__main__':
+    main()
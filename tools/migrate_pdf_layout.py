@@ -0,0 +1,177 @@
+"""
+Move stored PDF blobs into the configured PDF_LAYOUT and store them as
+backend-relative keys (rows written before storage keys hold absolute paths).
+
+    python -m tools.migrate_pdf_layout --workers 8 --batch-size 500 [--dry-run] [--restart]
+
+Safe to run while the app is serving. Each batch:
+  1. hard-links (or copies) blobs to their new paths, in parallel,
+  2. rewrites pdfBlobs.blobPath and pdfTable.pdf to the new keys in one transaction,
+  3. deletes the old paths.
+Both paths are valid until step 3, and downloads that still have the old
+path cached look it up again when the file is gone. Progress is
+checkpointed in PDF_BASE_PATH/.layout-migration, so an interrupted run
+resumes where it stopped; blobs already in place are skipped anyway.
+
+Rows without a sha256 (not yet deduplicated) are left alone; run
+tools.dedup_pdfs first. Works on the local tree; to move to S3/MinIO
+afterwards, copy PDF_BASE_PATH to the bucket prefix as-is (keys are
+the relative paths) and switch PDF_STORAGE.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.daos.base_dao import BaseDAO
+from app.database.connection import DatabaseConnection
+from app.storage.backends import LocalStorageBackend
+from app.storage.layout import PdfLayout
+from tools.dedup_pdfs import place_blob, remove_file, same_file_path
+
+CHECKPOINT_FILE = '.layout-migration'
+
+
+def load_batch(cursor, after_sha: str, batch_size: int):
+    cursor.execute("""
+        SELECT TOP (?) b.sha256, b.blobPath, MIN(p.orderYear) AS orderYear
+        FROM dbo.pdfBlobs AS b
+        LEFT JOIN dbo.pdfTable AS p ON p.sha256 = b.sha256
+        WHERE b.sha256 > ?
+        GROUP BY b.sha256, b.blobPath
+        ORDER BY b.sha256
+    """, (batch_size, after_sha))
+    return cursor.fetchall()
+
+
+def count_unhashed(cursor) -> int:
+    cursor.execute("SELECT COUNT(*) FROM dbo.pdfTable WHERE sha256 IS NULL")
+    return cursor.fetchone()[0]
+
+
+def rewrite_paths(conn, moves):
+    """Point blobs and their rows at the new paths, in one transaction"""
+    cursor = conn.cursor()
+    try:
+        BaseDAO.load_temp_table(
+            cursor, '#layoutMoves',
+            "SELECT TOP 0 sha256, blobPath INTO #layoutMoves FROM dbo.pdfBlobs",
+            ('sha256', 'blobPath'), moves,
+        )
+        cursor.execute("""
+        UPDATE b SET blobPath = m.blobPath
+        FROM dbo.pdfBlobs AS b
+        JOIN #layoutMoves AS m ON m.sha256 = b.sha256;
+
+        UPDATE p SET pdf = m.blobPath
+        FROM dbo.pdfTable AS p
+        JOIN #layoutMoves AS m ON m.sha256 = p.sha256;
+
+        DROP TABLE #layoutMoves;
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def read_checkpoint(path: str) -> str:
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ''
+
+
+def write_checkpoint(path: str, sha256: str):
+    temp = f"{path}.tmp"
+    with open(temp, 'w', encoding='ascii') as f:
+        f.write(sha256)
+    os.replace(temp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8, help="parallel link/copy/delete threads")
+    parser.add_argument('--batch-size', type=int, default=500, help="blobs per transaction")
+    parser.add_argument('--dry-run', action='store_true', help="only count what would move")
+    parser.add_argument('--restart', action='store_true', help="ignore the checkpoint and rescan from the start")
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    app = create_app(config_name=args.config)
+    storage = app.extensions['pdf_storage']
+    if not isinstance(storage, LocalStorageBackend):
+        parser.error("migrate_pdf_layout works on the local PDF_BASE_PATH tree (PDF_STORAGE = 'local')")
+    layout = PdfLayout.from_config(app.config)
+    checkpoint = os.path.join(storage.root, CHECKPOINT_FILE)
+    after_sha = '' if args.restart or args.dry_run else read_checkpoint(checkpoint)
+    if after_sha:
+        print(f"resuming after {after_sha}")
+
+    started = time.perf_counter()
+    scanned = moved = missing = 0
+
+    with DatabaseConnection.connection() as conn, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        cursor = conn.cursor()
+        unhashed = count_unhashed(cursor)
+        cursor.close()
+        if unhashed:
+            print(f"❌ {unhashed} pdfTable rows have no sha256 and will not move; run tools.dedup_pdfs first")
+
+        while True:
+            cursor = conn.cursor()
+            rows = load_batch(cursor, after_sha, args.batch_size)
+            cursor.close()
+            if not rows:
+                break
+            after_sha = rows[-1][0]
+            scanned += len(rows)
+
+            pending = [
+                (sha, old, layout.key(sha, year))
+                for sha, old, year in rows
+                if not layout.is_laid_out(old, sha)
+            ]
+            if args.dry_run:
+                moved += len(pending)
+                continue
+
+            def copy(move):
+                sha, old, new = move
+                try:
+                    place_blob(storage.local_path(old), storage.local_path(new))
+                    return move
+                except FileNotFoundError:
+                    print(f"❌ {sha}: blob missing at {old}, skipped")
+                    return None
+
+            placed = [move for move in executor.map(copy, pending) if move]
+            missing += len(pending) - len(placed)
+            if placed:
+                rewrite_paths(conn, [(sha, new) for sha, _, new in placed])
+                # Committed: nothing references the old paths any more
+                list(executor.map(remove_file, [
+                    storage.local_path(old) for _, old, new in placed
+                    if not same_file_path(storage.local_path(old), storage.local_path(new))
+                ]))
+                moved += len(placed)
+
+            write_checkpoint(checkpoint, after_sha)
+            print(f"✅ {moved} blobs moved, {scanned} scanned (last {after_sha})")
+
+    elapsed = time.perf_counter() - started
+    verb = "would move" if args.dry_run else "moved"
+    print(f"scanned {scanned} blobs in {elapsed:.1f}s; {verb} {moved}, {missing} missing")
+    if not args.dry_run:
+        try:
+            os.remove(checkpoint)  # finished: next run starts from the beginning
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Fire parallel uploads at one order and check every countPdf is unique.
+
+    python -m tools.stress_pdf_upload --order-id 123 --order-no 45 --order-year 2024 --uploads 50
+
+Uploads go through the Flask app (test client) into an in-memory storage
+backend (--storage config uses the configured one); the rows and blobs
+are deleted afterwards. tests/test_pdf_upload_concurrency.py runs the same
+check against an in-process stand-in for SQL Server.
+"""
+import argparse
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.daos.pdf_dao import PdfDAO
+from app.database.connection import DatabaseConnection
+from app.storage.backends import InMemoryStorageBackend
+
+
+def upload(app, args, n: int):
+    body = b'%PDF-1.4\n% stress upload ' + str(n).encode() + b'\n%%EOF\n'
+    with app.test_client() as client:
+        response = client.post('/api/pdfs/upload', data={
+            'orderID': str(args.order_id),
+            'orderNo': args.order_no,
+            'orderYear': args.order_year,
+            'pdf': (io.BytesIO(body), f'stress-{n}.pdf'),
+        })
+    return response.status_code, response.get_json()
+
+
+def cleanup(pdf_ids, storage):
+    for pdf_id in pdf_ids:
+        with DatabaseConnection.unit_of_work() as uow:
+            PdfDAO(uow).delete_pdf(pdf_id, storage)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--order-id', type=int, required=True)
+    parser.add_argument('--order-no', required=True)
+    parser.add_argument('--order-year', required=True)
+    parser.add_argument('--uploads', type=int, default=50)
+    parser.add_argument('--storage', choices=('memory', 'config'), default='memory')
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    app = create_app(config_name=args.config)
+    if args.storage == 'memory':
+        app.extensions['pdf_storage'] = InMemoryStorageBackend()
+    storage = app.extensions['pdf_storage']
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.uploads) as executor:
+        results = list(executor.map(lambda n: upload(app, args, n), range(args.uploads)))
+    elapsed = time.perf_counter() - started
+
+    created = [body for status, body in results if status == 201]
+    failed = [(status, body) for status, body in results if status != 201]
+    try:
+        # Blob paths are content-addressed (<sha256>.pdf) and no longer carry
+        # the count, so take it from the response body
+        counts = sorted(body['countPdf'] for body in created)
+        missing = [body['filePath'] for body in created if not storage.exists(body['filePath'])]
+
+        print(f"{len(created)}/{args.uploads} uploads succeeded in {elapsed:.2f}s")
+        for status, body in failed[:5]:
+            print(f"  failed: {status} {body}")
+        print(f"distinct counts: {len(set(counts))} (duplicates: {len(counts) - len(set(counts))})")
+        print(f"blobs missing from storage: {len(missing)}")
+        ok = not failed and len(set(counts)) == len(counts) and not missing
+        print("✅ OK" if ok else "❌ FAILED")
+    finally:
+        cleanup([body['pdfID'] for body in created], storage)
+
+
+if __name__ == '__main__':
+    main()